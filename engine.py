@@ -0,0 +1,1061 @@
+# LuckSweeper の盤面・ボットエンジン (Qt非依存)
+# トーナメントのワーカープロセスはこのモジュールだけを読み込むので、ここでは PySide6 を import しない
+import sys
+import os
+import time
+import random
+import heapq
+import json
+from collections import OrderedDict, deque
+from array import array
+from functools import lru_cache
+
+# ==========================================
+# 近傍インデックス表
+# ==========================================
+@lru_cache(maxsize=32)
+def neighbor_table(w, h):
+    """
+    盤面サイズ (w, h) ごとの8近傍表を作る。
+    table[i] はフラットインデックス i (= y * w + x) に隣接する有効なマスのインデックスのタプル。
+    範囲チェック済みなのでホットループ内で境界判定やリスト生成をする必要がない。
+    同じサイズの盤面ではゲームをまたいで共有される。
+    """
+    table = []
+    for y in range(h):
+        ys = range(max(0, y - 1), min(h, y + 2))
+        for x in range(w):
+            xs = range(max(0, x - 1), min(w, x + 2))
+            table.append(tuple(ny * w + nx for ny in ys for nx in xs if nx != x or ny != y))
+    return tuple(table)
+
+# ==========================================
+# ボット思考エンジン (Qt非依存)
+# ==========================================
+HIDDEN = 9    # 未開放マス
+FLAGGED = 10  # 旗を立てたマス
+
+# --- 局所パターンの推論キャッシュ ---
+PATTERN_SIZE = 5      # 窓の一辺（最前線のマスを中心に ±2）
+PATTERN_MAX_VARS = 20 # これより未知数が多い窓は推論しない
+OUTSIDE = 12          # 窓の中で盤面外のマス
+OPEN = 13             # 窓の外周の開放済みマス（外周の数字は推論に使わないので区別しない）
+
+def _window_transforms(k):
+    """k×k の窓に対する回転・反転8通りのインデックス置換表（変換後の位置 -> 元の位置）"""
+    perms = []
+    for t in range(8):
+        perm = []
+        for y in range(k):
+            for x in range(k):
+                sx, sy = x, y
+                if t & 1: sx = k - 1 - sx   # 左右反転
+                if t & 2: sy = k - 1 - sy   # 上下反転
+                if t & 4: sx, sy = sy, sx   # 転置
+                perm.append(sy * k + sx)
+        perms.append(tuple(perm))
+    return perms
+
+_PATTERN_TRANSFORMS = _window_transforms(PATTERN_SIZE)
+
+def solve_window(window):
+    """
+    窓の内側 3×3 にある数字（近傍が窓に収まるもの）を制約として、窓内の未開放マスの爆弾配置を全列挙し、
+    どの配置でも安全 / どの配置でも爆弾になるマスを (安全な位置, 爆弾の位置) で返す（位置は窓内 0-24）。
+    旗は爆弾、盤面外と開放済みは爆弾なしとして扱う。
+    """
+    k = PATTERN_SIZE
+    constraints = [] # (未開放マスの位置, 残り爆弾数)
+    for y in range(1, k - 1):
+        for x in range(1, k - 1):
+            num = window[y * k + x]
+            if num > 8: continue
+            cells = []
+            need = num
+            for ny in (y - 1, y, y + 1):
+                for nx in (x - 1, x, x + 1):
+                    s = window[ny * k + nx]
+                    if s == HIDDEN: cells.append(ny * k + nx)
+                    elif s == FLAGGED: need -= 1
+            if cells: constraints.append((cells, need))
+    
+    variables = sorted({p for cells, _ in constraints for p in cells})
+    if not variables or len(variables) > PATTERN_MAX_VARS: return (), ()
+    index = {p: j for j, p in enumerate(variables)}
+    needs = [need for _, need in constraints]
+    placed = [0] * len(constraints)                 # 制約ごとの置いた爆弾数
+    left = [len(cells) for cells, _ in constraints] # 制約ごとの未割り当て数
+    by_var = [[] for _ in variables]
+    for ci, (cells, _) in enumerate(constraints):
+        for p in cells:
+            by_var[index[p]].append(ci)
+    assign = [0] * len(variables)
+    seen = [0] * len(variables) # bit0: 安全な配置あり / bit1: 爆弾の配置あり
+    
+    def search(j):
+        if j == len(variables):
+            for v, a in enumerate(assign):
+                seen[v] |= 1 << a
+            return
+        for a in (0, 1):
+            if any(placed[ci] + a > needs[ci] or placed[ci] + a + left[ci] - 1 < needs[ci] for ci in by_var[j]):
+                continue
+            for ci in by_var[j]:
+                placed[ci] += a
+                left[ci] -= 1
+            assign[j] = a
+            search(j + 1)
+            for ci in by_var[j]:
+                placed[ci] -= a
+                left[ci] += 1
+    
+    search(0)
+    safe = tuple(p for p, v in zip(variables, seen) if v == 1)
+    mines = tuple(p for p, v in zip(variables, seen) if v == 2)
+    return safe, mines
+
+class PatternCache:
+    """
+    局所パターン（5×5 の窓）-> 確定マス の推論結果を覚えておく LRU キャッシュ。
+    窓は回転・反転8通りのうち最小のバイト列に正規化するので、向きが違うだけの形は同じエントリになる。
+    正規化は8通りの並べ替えで重いので、見たことのある向きの窓は正規化前のバイト列で1回引くだけで済ませる。
+    ゲームをまたいで共有し、ファイルに保存して次回の起動で温めておくこともできる（保存するのは正規化した表だけ）。
+    """
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.table = OrderedDict()    # 正規化した窓 -> (安全な位置, 爆弾の位置)
+        self.oriented = OrderedDict() # 元の向きの窓 -> 元の向きの (安全な位置, 爆弾の位置)
+        self.hits = 0
+        self.misses = 0
+
+    def deduce(self, window):
+        """窓 (25バイト) の中で確定するマスを、元の向きの窓内位置で (安全, 爆弾) として返す"""
+        raw = bytes(window)
+        found = self.oriented.get(raw)
+        if found is not None:
+            self.hits += 1
+            self.oriented.move_to_end(raw)
+            return found
+        key, perm = min((bytes(window[p] for p in perm), perm) for perm in _PATTERN_TRANSFORMS)
+        result = self.table.get(key)
+        if result is None:
+            self.misses += 1
+            result = solve_window(key)
+            self.table[key] = result
+            if len(self.table) > self.maxsize:
+                self.table.popitem(last=False)
+        else:
+            self.hits += 1
+            self.table.move_to_end(key)
+        safe, mines = result
+        found = ([perm[p] for p in safe], [perm[p] for p in mines])
+        self.oriented[raw] = found
+        if len(self.oriented) > self.maxsize:
+            self.oriented.popitem(last=False)
+        return found
+
+    def stats(self):
+        total = max(self.hits + self.misses, 1)
+        return f"patterns: {len(self.table)} entries, {self.hits} hits / {self.misses} misses ({100 * self.hits / total:.1f}% hit)"
+
+    def load(self, path):
+        """
+        保存済みのキャッシュを読み込む（ファイルがなければ何もしない）。
+        JSON として読めないファイルは丸ごと、窓の長さ・マスの値・位置が範囲外のエントリは1件ずつ読み飛ばす
+        （キャッシュなので、壊れていても推論し直せば済む）。
+        """
+        if not os.path.exists(path): return
+        cells = PATTERN_SIZE * PATTERN_SIZE
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except ValueError:
+            return
+        if not isinstance(data, dict): return
+        for key, entry in data.items():
+            try:
+                window = bytes.fromhex(key)
+                safe, mines = (tuple(positions) for positions in entry)
+            except (TypeError, ValueError):
+                continue
+            if len(window) != cells or max(window) > OPEN: continue
+            if not all(type(p) is int and 0 <= p < cells and window[p] == HIDDEN for p in safe + mines): continue
+            self.table[window] = (safe, mines)
+        while len(self.table) > self.maxsize:
+            self.table.popitem(last=False)
+
+    def save(self, path):
+        """一時ファイルに書いてから置き換えるので、途中で止まっても前のファイルが残る"""
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({key.hex(): [list(safe), list(mines)] for key, (safe, mines) in self.table.items()}, f)
+        os.replace(tmp, path)
+
+PATTERN_CACHE = PatternCache() # 全ゲーム（同じプロセス内）で共有
+
+class LogicBot:
+    """
+    ボットが見ている盤面のミラーと、論理的に確定したマスを管理するクラス。
+    盤面の変化（開放・旗）を差分で受け取り、影響を受けた数字マスだけを再評価する。
+    Island戦略では「開放済み近傍数（角スコア）」をキーにしたヒープから次の一手を取り出すので、
+    毎手の全走査とソートが不要になる。スコアが変わったマスは新しいエントリを積み直し、
+    古いエントリは取り出すときに捨てる（遅延無効化）。
+    単独の数字で決まるマスがなくなったら、最前線の周囲 5×5 を PATTERN_CACHE で推論する。
+    """
+    def __init__(self, w, h, patterns=True):
+        self.w = w
+        self.h = h
+        self.patterns = patterns
+        self.neighbors = neighbor_table(w, h)
+        total = w * h
+        self.state = bytearray([HIDDEN]) * total  # 0-8: 開放済みの数字 / HIDDEN / FLAGGED
+        self.score = bytearray(total)             # 開放済み近傍数（角スコア）
+        self.forced = {}                          # 確定マス -> 'flag' / 'reveal'
+        self.heap = []                            # (-スコア, インデックス)
+        self.dirty = set()                        # 再評価待ちの数字マス
+        self.changed = set()                      # 前回のパターン推論から変化したマス（窓の再推論用）
+
+    def reveal(self, opened):
+        """開放されたマスの一覧 [(インデックス, 数字), ...] を反映する"""
+        state, score, forced, dirty = self.state, self.score, self.forced, self.dirty
+        nbrs = self.neighbors
+        for i, num in opened:
+            if state[i] < HIDDEN: continue
+            state[i] = num
+            forced.pop(i, None)
+            if num: dirty.add(i)
+            if self.patterns: self.changed.add(i)
+            for n in nbrs[i]:
+                score[n] += 1
+                s = state[n]
+                if s == HIDDEN:
+                    # 角スコアが上がったので、確定済みならキューに積み直す
+                    if n in forced: heapq.heappush(self.heap, (-score[n], n))
+                elif 0 < s < HIDDEN:
+                    dirty.add(n)
+
+    def flag(self, i):
+        """旗を立てたマスを反映する"""
+        if self.state[i] != HIDDEN: return
+        self.state[i] = FLAGGED
+        self.forced.pop(i, None)
+        if self.patterns: self.changed.add(i)
+        for n in self.neighbors[i]:
+            if 0 < self.state[n] < HIDDEN: self.dirty.add(n)
+
+    def flush(self):
+        """変化のあった数字マスだけを調べ、新しく確定したマスをキューに追加する"""
+        state, score, forced, heap = self.state, self.score, self.forced, self.heap
+        nbrs = self.neighbors
+        for i in self.dirty:
+            num = state[i]
+            unk = [] # 周囲の未開放セル
+            flg = 0  # 周囲のフラグ数
+            for n in nbrs[i]:
+                s = state[n]
+                if s == FLAGGED: flg += 1
+                elif s == HIDDEN: unk.append(n)
+            if not unk: continue
+            # ロジックA: 残り未開放数 == 数字 - 旗数 -> すべて爆弾（フラグ）
+            if num == flg + len(unk): kind = 'flag'
+            # ロジックB: 数字 == 旗数 -> 残りすべて安全（オープン）
+            elif num == flg: kind = 'reveal'
+            else: continue
+            for n in unk:
+                if n not in forced:
+                    forced[n] = kind
+                    heapq.heappush(heap, (-score[n], n))
+        self.dirty.clear()
+
+    def scan(self):
+        """標準戦略: 盤面を行順に走査し、最初に見つかった確定マスを返す"""
+        state = self.state
+        nbrs = self.neighbors
+        for i, num in enumerate(state):
+            if 0 < num < HIDDEN:
+                unk = []
+                flg = 0
+                for n in nbrs[i]:
+                    s = state[n]
+                    if s == FLAGGED: flg += 1
+                    elif s == HIDDEN: unk.append(n)
+                if not unk: continue
+                if num == flg + len(unk): return 'flag', unk[0]
+                if num == flg: return 'reveal', unk[0]
+        return None
+
+    def window(self, c):
+        """マス c を中心にした 5×5 の窓（パターンキャッシュのキー）"""
+        w, h, state = self.w, self.h, self.state
+        r = PATTERN_SIZE // 2
+        cx, cy = c % w, c // w
+        out = bytearray()
+        for dy in range(-r, r + 1):
+            y = cy + dy
+            for dx in range(-r, r + 1):
+                x = cx + dx
+                if 0 <= x < w and 0 <= y < h:
+                    s = state[y * w + x]
+                    if s < HIDDEN and r in (dx, -dx, dy, -dy): s = OPEN
+                else:
+                    s = OUTSIDE
+                out.append(s)
+        return out
+
+    def deduce_patterns(self):
+        """
+        最前線（開放済みマスに接する未開放マス）ごとに窓を推論し、確定したマスを追加する。追加があれば True。
+        窓の中身が前回から変わっていなければ結果も同じ（すでに forced にある）なので、
+        前回から変化したマスの ±2 以内にある最前線だけを推論し直す。
+        """
+        state, score, forced = self.state, self.score, self.forced
+        w, h, k, r = self.w, self.h, PATTERN_SIZE, PATTERN_SIZE // 2
+        if len(self.changed) * k * k >= len(state):
+            # 大きな連鎖開放の直後などは、変化したマスの周りを調べるより全体を1回走査する方が速い
+            frontier = [c for c, s in enumerate(state) if s == HIDDEN and score[c]]
+        else:
+            frontier = set()
+            for i in self.changed:
+                cx, cy = i % w, i // w
+                for y in range(max(0, cy - r), min(h, cy + r + 1)):
+                    row = y * w
+                    for c in range(row + max(0, cx - r), row + min(w, cx + r + 1)):
+                        if state[c] == HIDDEN and score[c]: frontier.add(c)
+        self.changed.clear()
+        found = False
+        for c in frontier:
+            safe, mines = PATTERN_CACHE.deduce(self.window(c))
+            for kind, positions in (('reveal', safe), ('flag', mines)):
+                for p in positions:
+                    i = c + (p // k - r) * w + (p % k - r)
+                    if i not in forced:
+                        forced[i] = kind
+                        heapq.heappush(self.heap, (-score[i], i))
+                        found = True
+        return found
+
+    def pop_island(self):
+        """Island戦略: 角スコアが最大の確定マス。古いエントリはここで捨てる"""
+        heap = self.heap
+        while heap:
+            neg, i = heap[0]
+            if self.state[i] == HIDDEN and i in self.forced and -neg == self.score[i]:
+                return self.forced[i], i
+            heapq.heappop(heap)
+        return None
+
+    def next_action(self, strategy):
+        """次の一手を (種類, インデックス) で返す。確定マスがなければ None"""
+        self.flush()
+        if strategy == 'Island':
+            action = self.pop_island()
+            if action is None and self.patterns and self.deduce_patterns():
+                action = self.pop_island()
+            return action
+        action = self.scan()
+        if action is None and self.patterns:
+            # 標準戦略: 単独の数字で決まらなければ、パターンで確定したマスをインデックス順に
+            if not self.forced: self.deduce_patterns()
+            if self.forced:
+                i = min(self.forced)
+                action = self.forced[i], i
+        return action
+
+# ==========================================
+# 盤面エンジン (Qt非依存)
+# ==========================================
+MINE = 11  # 差分コード: 開いた爆弾（0-8 は数字、HIDDEN / FLAGGED は上と共通）
+
+def generate_island_mines(w, h, mines_to_place, rng=random, seed_div=5, grow_rate=0.80):
+    """
+    【重要】海モード専用: 爆弾を島状に配置するアルゴリズム (難易度調整版)
+    完全ランダムではなく、既存の爆弾の隣に新しい爆弾を置く確率を高めることで「島」を作る。
+    ただし、あまりに密集すると難易度が高すぎるため、適度にバラけさせる調整を入れている。
+    rng を渡すとシード固定で同じ盤面を再現できる（トーナメント・解析用）。
+    seed_div（爆弾何個につき種1つか）と grow_rate（結合確率）は --metrics で難易度と見比べて調整する。
+    """
+    total = w * h
+    if mines_to_place >= total: return list(range(total))
+    
+    mine_set = set()
+    
+    # 1. 最初の「種（シード）」を撒く
+    # 種の数が多いほど、島が分散して「諸島」になり、隙間ができやすくなる（難易度緩和）
+    seeds = min(total, max(3, mines_to_place // seed_div)) # 極小盤面でも空きマスがなくならないように
+    
+    for _ in range(seeds):
+        while True:
+            idx = rng.randint(0, total - 1)
+            if idx not in mine_set:
+                mine_set.add(idx)
+                break
+    
+    # 2. 残りの爆弾を配置
+    attempts = 0
+    while len(mine_set) < mines_to_place and attempts < total * 10:
+        attempts += 1
+        
+        # 結合確率: 80%なら隣にくっつく、20%なら離れた場所に飛ぶ
+        # 以前の93%から下げて、隙間を作りやすくした
+        grow_island = (rng.random() < grow_rate)
+        
+        if grow_island and mine_set:
+            # 既存の爆弾をランダムに選び、その周囲8方向に増殖を試みる
+            src_idx = rng.choice(list(mine_set))
+            sx, sy = src_idx % w, src_idx // w
+            
+            dx, dy = rng.choice([(0,1), (0,-1), (1,0), (-1,0), (1,1), (-1,-1), (1,-1), (-1,1)])
+            nx, ny = sx + dx, sy + dy
+            
+            if 0 <= nx < w and 0 <= ny < h:
+                n_idx = ny * w + nx
+                mine_set.add(n_idx)
+        else:
+            # 完全ランダム配置（飛地を作る）
+            idx = rng.randint(0, total - 1)
+            mine_set.add(idx)
+            
+    return list(mine_set)
+
+def place_mines(w, h, ratio, sea=False, rng=random, **island_params):
+    """爆弾の位置（フラットインデックスのリスト）を決める。sea=True なら島生成（island_params はその調整値）"""
+    total = w * h
+    num_mines = max(1, int(total * ratio))
+    if sea:
+        return generate_island_mines(w, h, num_mines, rng, **island_params)
+    return rng.sample(range(total), num_mines)
+
+class DictBoard:
+    """
+    辞書セルで盤面を持つゲームロジック。
+    cells は BoardWidget が描画に使う2次元配列で、flat は同じ辞書をフラットに並べたもの。
+    """
+    def __init__(self, w, h, mine_indices):
+        self.w = w
+        self.h = h
+        self.neighbors = neighbor_table(w, h)
+        self.cells = [[{'is_mine': False, 'revealed': False, 'flagged': False, 'neighbor': 0}
+                       for _ in range(w)] for _ in range(h)]
+        self.flat = [c for row in self.cells for c in row]
+        
+        flat = self.flat
+        for i in mine_indices:
+            flat[i]['is_mine'] = True
+        self.num_mines = len(mine_indices)
+        self.hidden_safe = w * h - self.num_mines  # 未開放の安全マス数（勝利判定用）
+        self.flag_count = 0
+        
+        # 隣接する爆弾の数を計算（爆弾の周囲に +1 していく。爆弾マス自身は 0 のまま）
+        nbrs = self.neighbors
+        for i in mine_indices:
+            for n in nbrs[i]:
+                nc = flat[n]
+                if not nc['is_mine']: nc['neighbor'] += 1
+
+    def reveal(self, i):
+        """
+        空白（0）のマスなら周囲を一気に開ける。
+        新しく開いたマスを [(インデックス, 数字), ...] で返す。
+        """
+        return [c for chunk in self.reveal_iter(i) for c in chunk]
+
+    def reveal_iter(self, i, chunk=64):
+        """
+        reveal の分割版。近傍表を幅優先でたどり、開いたマスを chunk 個ずつ返すジェネレータ。
+        再帰を使わないので広いマップでも再帰上限を気にしなくてよく、途中で止めれば1フレームずつ進められる。
+        返した分までは盤面（hidden_safe も含む）に反映済み。
+        """
+        flat = self.flat
+        nbrs = self.neighbors
+        opened = []
+        queue = deque([i])
+        while queue:
+            i = queue.popleft()
+            cell = flat[i]
+            if cell['revealed']: continue
+            cell['revealed'] = True
+            opened.append((i, cell['neighbor']))
+            if cell['neighbor'] == 0:
+                queue.extend(n for n in nbrs[i] if not flat[n]['revealed'])
+            if len(opened) >= chunk:
+                self.hidden_safe -= len(opened)
+                yield opened
+                opened = []
+        if opened:
+            self.hidden_safe -= len(opened)
+            yield opened
+
+    def flag(self, i):
+        """旗を立てる。立てられたら True"""
+        cell = self.flat[i]
+        if cell['revealed'] or cell['flagged']: return False
+        cell['flagged'] = True
+        self.flag_count += 1
+        return True
+
+    def is_won(self):
+        return self.hidden_safe == 0
+
+    def is_mine(self, i):
+        return self.flat[i]['is_mine']
+
+    def hidden_cells(self):
+        """未開放で旗のないマスのインデックス（昇順）"""
+        return [i for i, c in enumerate(self.flat) if not c['revealed'] and not c['flagged']]
+
+    def mine_cells(self):
+        return [i for i, c in enumerate(self.flat) if c['is_mine']]
+
+    def revert(self, changes):
+        """変化 [(インデックス, コード), ...] を取り消す（元に戻す用）"""
+        flat = self.flat
+        for i, code in changes:
+            cell = flat[i]
+            if code == FLAGGED:
+                cell['flagged'] = False
+                self.flag_count -= 1
+            else:
+                cell['revealed'] = False
+                if not cell['is_mine']: self.hidden_safe += 1
+
+    def replay(self, changes):
+        """revert で取り消した変化をもう一度反映する（やり直し用）"""
+        flat = self.flat
+        for i, code in changes:
+            cell = flat[i]
+            if code == FLAGGED:
+                cell['flagged'] = True
+                self.flag_count += 1
+            else:
+                cell['revealed'] = True
+                if not cell['is_mine']: self.hidden_safe -= 1
+
+    def snapshot_changes(self):
+        """今の盤面を「空の盤面からの変化」として返す（ボットのミラーを作り直す用）"""
+        return ([(i, c['neighbor']) for i, c in enumerate(self.flat) if c['revealed'] and not c['is_mine']],
+                [i for i, c in enumerate(self.flat) if c['flagged']])
+
+class MoveHistory:
+    """
+    元に戻す / やり直し と what-if 分岐のための差分スタック。
+    1手ごとに「その手で変わったマス」[(インデックス, コード), ...] だけを積むので、
+    メモリは盤面サイズ × 手数ではなく、実際に変化したマスの数に比例する。
+    分岐点は undo スタックの長さで覚えておき、戻るときはそこまで差分を巻き戻す。
+    分岐点で別の手を打つと、それまでの枝（やり直し用の手の並び）は捨てずに分岐点にしまっておき、
+    switch_branch で入れ替えられる。分岐点より前まで戻すと、その分岐点と枝は消える。
+    """
+    def __init__(self):
+        self.undo_stack = [] # [(変化, 結果 'win' / 'lose' / None)]
+        self.redo_stack = []
+        self.forks = []      # [(分岐点の undo_stack の長さ, しまってある枝のリスト)]
+
+    def record(self, changes, result=None):
+        """1手分を積む。新しい手を打つとやり直し用の手は捨てる（分岐点なら枝としてしまう）"""
+        if self.redo_stack and self.at_fork():
+            self.forks[-1][1].append(self.redo_stack)
+            self.redo_stack = []
+        self.redo_stack.clear()
+        self.undo_stack.append((tuple(changes), result))
+
+    def undo(self):
+        move = self.undo_stack.pop()
+        self.redo_stack.append(move)
+        # 分岐点より前に戻ったら、その分岐点はもう使えない
+        while self.forks and self.forks[-1][0] > len(self.undo_stack):
+            self.forks.pop()
+        return move
+
+    def redo(self):
+        move = self.redo_stack.pop()
+        self.undo_stack.append(move)
+        return move
+
+    def fork(self):
+        if not self.at_fork():
+            self.forks.append((len(self.undo_stack), []))
+
+    def at_fork(self):
+        return bool(self.forks) and self.forks[-1][0] == len(self.undo_stack)
+
+    def moves_since_fork(self):
+        return len(self.undo_stack) - self.forks[-1][0] if self.forks else 0
+
+    def branch_count(self):
+        """いちばん新しい分岐点から出ている枝の数（今たどっている枝を含む）"""
+        return len(self.forks[-1][1]) + 1 if self.forks else 0
+
+    def switch_branch(self):
+        """
+        分岐点にいるときに、今の枝としまってある枝を入れ替える（順番に巡回する）。
+        入れ替えた枝は redo_stack に入るので、やり直しでたどれる。
+        """
+        depth, branches = self.forks[-1]
+        if self.redo_stack: branches.append(self.redo_stack)
+        self.redo_stack = branches.pop(0)
+
+_BIN_TO_BYTE = bytes.maketrans(b'01', b'\x00\x01')
+
+class BitboardBoard:
+    """
+    爆弾・開放・旗の各レイヤーを Python の多倍長整数（ビットボード）で持つ盤面ロジック。
+    ビット i がフラットインデックス i のマス。近傍は列端マスク付きのシフトで求めるので、
+    連鎖開放・確定マス判定・勝利判定が盤面全体のビット演算（C実装）で済む。
+    DictBoard と同じ操作 (reveal / flag / is_won など) を持ち、同じ結果を返す。
+    """
+    def __init__(self, w, h, mine_indices):
+        self.w = w
+        self.h = h
+        self.n = w * h
+        self.full = (1 << self.n) - 1
+        col0 = int(('0' * (w - 1) + '1') * h, 2) # 各行の左端 (x == 0) のビット
+        self.not_left = self.full & ~col0
+        self.not_right = self.full & ~(col0 << (w - 1))
+        
+        self.mines = self.mask_of(mine_indices)
+        self.safe = self.full & ~self.mines
+        self.revealed = 0
+        self.flagged = 0
+        self.num_mines = len(mine_indices)
+        self.hidden_safe = self.n - self.num_mines
+        self.flag_count = 0
+        
+        # 隣接爆弾数を4枚のビットプレーン（1, 2, 4, 8 の位）で持つ。爆弾マス自身は 0
+        self.planes = [p & self.safe for p in self.count_planes(self.mines)]
+        self.zeros = self.safe & ~(self.planes[0] | self.planes[1] | self.planes[2] | self.planes[3])
+        # 1マス1バイトの数字表（差分通知用）
+        packed = 0
+        for k, p in enumerate(self.planes):
+            packed |= int.from_bytes(self.bits_of(p).encode().translate(_BIN_TO_BYTE), 'little') << k
+        self.numbers = packed.to_bytes(self.n, 'little')
+
+    # --- ビット演算の部品 ---
+    def mask_of(self, indices):
+        """インデックスのリストをビットマスクにする"""
+        digits = bytearray(b'0' * self.n)
+        for i in indices:
+            digits[self.n - 1 - i] = ord('1')
+        return int(digits, 2)
+
+    def bits_of(self, mask):
+        """マスクを「インデックス順に並べた '0'/'1' 文字列」にする"""
+        return format(mask, f'0{self.n}b')[::-1]
+
+    def indices(self, mask):
+        """マスクの立っているビットのインデックス（昇順）"""
+        bits = self.bits_of(mask)
+        out = []
+        i = bits.find('1')
+        while i >= 0:
+            out.append(i)
+            i = bits.find('1', i + 1)
+        return out
+
+    def shifted(self, m):
+        """各マスに「8方向それぞれの隣のビット」を集めたマスク8枚（盤面外は落とす）"""
+        w, full = self.w, self.full
+        from_left = (m << 1) & self.not_left   # 左隣のビット
+        from_right = (m >> 1) & self.not_right # 右隣のビット
+        out = [from_left, from_right]
+        for row in (m, from_left, from_right):
+            out.append((row << w) & full)      # 上の行のビット
+            out.append(row >> w)               # 下の行のビット
+        return out
+
+    def dilate(self, m):
+        """m のどれかに隣接するマス"""
+        out = 0
+        for s in self.shifted(m):
+            out |= s
+        return out
+
+    def count_planes(self, m):
+        """各マスについて m に含まれる隣接マスの数を数え、ビットプレーン4枚で返す（ビットスライス加算）"""
+        planes = [0, 0, 0, 0]
+        for carry in self.shifted(m):
+            for k in range(4):
+                planes[k], carry = planes[k] ^ carry, planes[k] & carry
+                if not carry: break
+        return planes
+
+    @staticmethod
+    def add_planes(a, b):
+        """ビットプレーン同士の加算（4ビットのリップルキャリー）"""
+        out = []
+        carry = 0
+        for x, y in zip(a, b):
+            out.append(x ^ y ^ carry)
+            carry = (x & y) | (carry & (x ^ y))
+        return out
+
+    def planes_equal(self, a, b):
+        """2組のビットプレーンが同じ値を持つマス"""
+        diff = 0
+        for x, y in zip(a, b):
+            diff |= x ^ y
+        return self.full & ~diff
+
+    # --- DictBoard と共通の操作 ---
+    def reveal(self, i):
+        """
+        空白（0）のマスなら周囲を一気に開ける。
+        「開いた0マスの近傍」を盤面全体のシフト演算で広げ、新しいマスがなくなるまで繰り返す。
+        新しく開いたマスを [(インデックス, 数字), ...] で返す。
+        """
+        bit = 1 << i
+        if self.revealed & bit: return []
+        region = bit
+        if self.zeros & bit:
+            allowed = self.full & ~self.revealed
+            frontier = bit
+            while True:
+                new = self.dilate(frontier & self.zeros) & allowed & ~region
+                if not new: break
+                region |= new
+                frontier = new
+        self.revealed |= region
+        nums = self.numbers
+        opened = [(i, nums[i])] if region == bit else [(j, nums[j]) for j in self.indices(region)]
+        self.hidden_safe -= len(opened)
+        return opened
+
+    def reveal_iter(self, i, chunk=None):
+        """DictBoard と同じ形の分割版（ビット演算で一度に開くので1回で全部返す）"""
+        opened = self.reveal(i)
+        if opened: yield opened
+
+    def flag(self, i):
+        """旗を立てる。立てられたら True"""
+        bit = 1 << i
+        if (self.revealed | self.flagged) & bit: return False
+        self.flagged |= bit
+        self.flag_count += 1
+        return True
+
+    def is_won(self):
+        return not (self.safe & ~self.revealed)
+
+    def is_mine(self, i):
+        return bool(self.mines >> i & 1)
+
+    def hidden_cells(self):
+        return self.indices(self.full & ~self.revealed & ~self.flagged)
+
+    def mine_cells(self):
+        return self.indices(self.mines)
+
+    def forced_moves(self):
+        """
+        LogicBot と同じ2つの規則を盤面全体のビット演算で一度に判定する。
+          ロジックA: 数字 == 旗数 + 未開放数 の数字マスの周囲は爆弾
+          ロジックB: 数字 == 旗数 の数字マスの周囲は安全
+        使うのは開いているマスの数字と旗・未開放の配置だけ。戻り値: (安全マスク, 爆弾マスク)
+        """
+        unknown = self.full & ~self.revealed & ~self.flagged
+        clues = self.revealed & self.safe
+        flg = self.count_planes(self.flagged)
+        unk = self.count_planes(unknown)
+        safe = self.dilate(clues & self.planes_equal(self.planes, flg)) & unknown
+        mines = self.dilate(clues & self.planes_equal(self.planes, self.add_planes(flg, unk))) & unknown
+        return safe, mines
+
+    def forced_actions(self):
+        """forced_moves を [(種類, インデックス), ...] にしたもの（旗が先）"""
+        safe, mines = self.forced_moves()
+        return [('flag', i) for i in self.indices(mines)] + [('reveal', i) for i in self.indices(safe)]
+
+# 盤面エンジンの選択肢（ヘッドレス対局・ベンチマーク用）
+ENGINES = {'dict': DictBoard, 'bitboard': BitboardBoard}
+
+def pack_deltas(changes):
+    """マスの変化 [(インデックス, コード), ...] を 1変化 4バイトのバイト列に詰める"""
+    return array('I', [(i << 4) | code for i, code in changes]).tobytes()
+
+def unpack_deltas(data):
+    """pack_deltas の逆変換"""
+    packed = array('I')
+    packed.frombytes(data)
+    return [(v >> 4, v & 0xF) for v in packed]
+
+def play_bot_game(w, h, ratio, strategy, seed, sea=False, on_change=None, engine='dict', patterns=True):
+    """
+    ボットに1局をヘッドレスで最後まで解かせる（トーナメント・解析用）。
+    手詰まりになったら未開放マスからランダムに推測して続ける。
+    engine='bitboard' のときは確定マスをビット演算でまとめて求めて全部適用する（戦略の順序とパターン推論は使わない）。
+    手詰まりになる局面と推測は patterns=False の dict と同じなので、同じシードなら同じ結果になる。
+    on_change を渡すと、手ごとにマスの変化 [(インデックス, コード), ...] が通知される。
+    戻り値: (勝ったか, 推測回数, 思考と盤面処理にかかった秒数)
+    """
+    rng = random.Random(seed)
+    board = ENGINES[engine](w, h, place_mines(w, h, ratio, sea, rng))
+    bot = LogicBot(w, h, patterns) if engine == 'dict' else None
+    guesses = 0
+    t0 = time.perf_counter()
+    while True:
+        if bot:
+            action = bot.next_action(strategy)
+            actions = [action] if action else []
+        else:
+            actions = board.forced_actions()
+        if not actions:
+            # 手詰まり -> 推測（1手目も推測扱い）
+            actions = [('reveal', rng.choice(board.hidden_cells()))]
+            guesses += 1
+        for kind, i in actions:
+            if kind == 'flag':
+                if not board.flag(i): continue
+                if bot: bot.flag(i)
+                changes = [(i, FLAGGED)]
+            elif board.is_mine(i):
+                if on_change:
+                    on_change([(n, MINE) for n in board.mine_cells()])
+                return False, guesses, time.perf_counter() - t0
+            else:
+                changes = board.reveal(i)
+                if bot: bot.reveal(changes)
+            if on_change: on_change(changes)
+            if board.is_won():
+                return True, guesses, time.perf_counter() - t0
+
+# ==========================================
+# 盤面の難易度解析 (--metrics)
+# ==========================================
+def _components(nbrs, members, roots=False):
+    """
+    members（インデックスの集合）を8近傍でつないだ連結成分の大きさを順に返す。
+    roots=True なら (大きさ, 成分内の1マス) を返す。
+    """
+    left = set(members)
+    while left:
+        root = left.pop()
+        stack = [root]
+        size = 0
+        while stack:
+            i = stack.pop()
+            size += 1
+            for n in nbrs[i]:
+                if n in left:
+                    left.remove(n)
+                    stack.append(n)
+        yield (size, root) if roots else size
+
+def board_metrics(board, rng=random):
+    """
+    1つの盤面 (DictBoard) の難易度指標を求める。
+      bbbv:      3BV（全安全マスを開けるのに最低限必要なクリック数）
+      openings:  0マスの連結領域（1クリックで一気に開く場所）の数
+      islands:   爆弾の島（8近傍でつながった塊）の大きさのリスト
+      guesses:   ボットが手詰まりになって推測が必要になった回数（最初の1手は数えない）
+    推測は答えを知っている前提で安全なマスを開けて進める。
+    """
+    flat, nbrs = board.flat, board.neighbors
+    zeros = [i for i, c in enumerate(flat) if not c['is_mine'] and c['neighbor'] == 0]
+    openings = sum(1 for _ in _components(nbrs, zeros))
+    # 0マスに接していない数字マスは1つずつクリックが必要
+    zero_set = set(zeros)
+    lone = sum(1 for i, c in enumerate(flat)
+               if not c['is_mine'] and c['neighbor'] and not any(n in zero_set for n in nbrs[i]))
+    islands = list(_components(nbrs, board.mine_cells()))
+    
+    bot = LogicBot(board.w, board.h)
+    guesses = -1
+    while not board.is_won():
+        action = bot.next_action('Standard')
+        if action is None:
+            guesses += 1
+            action = ('reveal', rng.choice([i for i in board.hidden_cells() if not flat[i]['is_mine']]))
+        kind, i = action
+        if kind == 'flag':
+            board.flag(i)
+            bot.flag(i)
+        else:
+            bot.reveal(board.reveal(i))
+    return {'bbbv': openings + lone, 'openings': openings, 'islands': islands, 'guesses': guesses}
+
+def iter_board_metrics(w, h, ratio, seeds, sea=False, **island_params):
+    """
+    シードごとに盤面を生成して board_metrics を1件ずつ返すジェネレータ。
+    盤面は1つずつ作って捨てるので、何百万局流してもメモリは一定。
+    """
+    for seed in seeds:
+        rng = random.Random(seed)
+        board = DictBoard(w, h, place_mines(w, h, ratio, sea, rng, **island_params))
+        record = board_metrics(board, rng)
+        record['seed'] = seed
+        record['mines'] = board.num_mines
+        yield record
+
+def summarize_metrics(records):
+    """
+    board_metrics の流れを1回なめて集計する（件数・平均・最小・最大と、島の大きさの分布）。
+    島の大きさは 1, 2-3, 4-7, 8-15, ... の2のべき乗ごとに数える。
+    """
+    fields = ('bbbv', 'openings', 'guesses', 'island_count', 'island_max')
+    count = 0
+    total = dict.fromkeys(fields, 0)
+    low = dict.fromkeys(fields)
+    high = dict.fromkeys(fields)
+    no_guess = 0
+    island_hist = {}
+    for rec in records:
+        count += 1
+        sizes = rec['islands']
+        values = dict(rec, island_count=len(sizes), island_max=max(sizes, default=0))
+        for f in fields:
+            v = values[f]
+            total[f] += v
+            low[f] = v if low[f] is None else min(low[f], v)
+            high[f] = v if high[f] is None else max(high[f], v)
+        no_guess += rec['guesses'] == 0
+        for size in sizes:
+            bucket = 1 << (size.bit_length() - 1)
+            island_hist[bucket] = island_hist.get(bucket, 0) + 1
+    return {
+        'boards': count,
+        'no_guess_rate': no_guess / max(count, 1),
+        'mean': {f: total[f] / max(count, 1) for f in fields},
+        'min': low,
+        'max': high,
+        'island_hist': dict(sorted(island_hist.items())),
+    }
+
+def parse_board_size(parser, text):
+    """--size の 'WxH' を (幅, 高さ) にする。書式違いや 2x2 未満は parser.error で終了する"""
+    try:
+        w, h = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        parser.error(f"--size は WxH の形で指定してください: {text}")
+    if w < 2 or h < 2:
+        parser.error(f"--size は 2x2 以上にしてください: {text}")
+    return w, h
+
+def run_metrics_cli(argv):
+    """python mine.py --metrics N [--size WxH] [--ratio R] [--sea] [--seed-div D] [--grow G] [--csv]"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='mine.py --metrics')
+    parser.add_argument('--metrics', type=int, required=True, help='解析する盤面の数')
+    parser.add_argument('--start', type=int, default=0, help='最初のシード')
+    parser.add_argument('--size', default='30x16')
+    parser.add_argument('--ratio', type=float, default=0.15)
+    parser.add_argument('--sea', action='store_true', help='島生成で配置する')
+    parser.add_argument('--seed-div', type=int, default=5)
+    parser.add_argument('--grow', type=float, default=0.80)
+    parser.add_argument('--csv', action='store_true', help='盤面ごとの行も出力する')
+    args = parser.parse_args(argv)
+    w, h = parse_board_size(parser, args.size)
+    if args.seed_div < 1:
+        parser.error(f"--seed-div は 1 以上にしてください: {args.seed_div}")
+    if not 0 <= args.grow <= 1:
+        parser.error(f"--grow は 0 から 1 の間にしてください: {args.grow}")
+    
+    records = iter_board_metrics(w, h, args.ratio, range(args.start, args.start + args.metrics), args.sea,
+                                 seed_div=args.seed_div, grow_rate=args.grow)
+    if args.csv:
+        def echo(stream):
+            print("seed,mines,bbbv,openings,islands,island_max,guesses")
+            for rec in stream:
+                sizes = rec['islands']
+                print(f"{rec['seed']},{rec['mines']},{rec['bbbv']},{rec['openings']},"
+                      f"{len(sizes)},{max(sizes, default=0)},{rec['guesses']}")
+                yield rec
+        records = echo(records)
+    summary = summarize_metrics(records)
+    
+    out = sys.stderr if args.csv else sys.stdout
+    print(f"{summary['boards']} boards {w}x{h} ratio={args.ratio} sea={args.sea} "
+          f"seed_div={args.seed_div} grow={args.grow}", file=out)
+    print(f"solved without guessing: {100 * summary['no_guess_rate']:.1f}%", file=out)
+    for f, mean in summary['mean'].items():
+        print(f"  {f:<13} mean {mean:8.2f}  min {summary['min'][f]}  max {summary['max'][f]}", file=out)
+    hist = ", ".join(f"{b}-{2 * b - 1}: {n}" if b > 1 else f"1: {n}" for b, n in summary['island_hist'].items())
+    print(f"  island sizes  {hist}", file=out)
+
+# ==========================================
+# エンジンのベンチマーク (--bench-engine)
+# ==========================================
+def run_engine_benchmark(sizes=(128, 256, 512), ratio=0.06, seed=1, out=sys.stdout):
+    """
+    DictBoard と BitboardBoard を同じ盤面で比べる。
+    盤面生成（隣接数の計算）、いちばん大きい0マスの領域の連鎖開放、開いた盤面の確定マス判定、1局の対局を計測し、
+    両エンジンの結果が一致することも確かめる。
+    """
+    print(f"{'size':>9} {'engine':<9} {'setup ms':>9} {'flood ms':>9} {'opened':>7} {'deduce ms':>10} {'game ms':>9}", file=out)
+    for size in sizes:
+        mines = place_mines(size, size, ratio, rng=random.Random(seed))
+        # いちばん大きい0マスの連結領域を開ける（両エンジンで同じマス）
+        ref = DictBoard(size, size, mines)
+        zeros = [i for i, c in enumerate(ref.flat) if not c['is_mine'] and c['neighbor'] == 0]
+        _, start = max(_components(ref.neighbors, zeros, roots=True))
+        results = {}
+        for name, cls in ENGINES.items():
+            t0 = time.perf_counter()
+            board = cls(size, size, mines)
+            t_setup = time.perf_counter() - t0
+            
+            t0 = time.perf_counter()
+            opened = board.reveal(start)
+            t_flood = time.perf_counter() - t0
+            
+            # 開いた盤面で、確定マスを全部求める
+            t0 = time.perf_counter()
+            if name == 'dict':
+                bot = LogicBot(size, size)
+                bot.reveal(opened)
+                bot.flush()
+                forced = sorted(bot.forced.items())
+            else:
+                forced = sorted((i, kind) for kind, i in board.forced_actions())
+            t_deduce = time.perf_counter() - t0
+            
+            game = play_bot_game(size, size, ratio, 'Island', seed, engine=name, patterns=False)
+            results[name] = (sorted(opened), forced, game[:2])
+            print(f"{size:>4}x{size:<4} {name:<9} {t_setup * 1000:9.1f} {t_flood * 1000:9.1f} {len(opened):7d} "
+                  f"{t_deduce * 1000:10.1f} {game[2] * 1000:9.1f}", file=out)
+        if results['dict'] != results['bitboard']:
+            raise AssertionError(f"engines disagree on {size}x{size}")
+
+# ==========================================
+# トーナメントのワーカー (別プロセス側)
+# ==========================================
+# (表示名, 戦略, 爆弾率, 海モード) 行ごとに1設定、列ごとに別の盤面
+# 同じ爆弾率・モードの設定どうしは同じシード列を使うので、同じ盤面で戦略を比べられる
+TOURNAMENT_CONFIGS = [
+    ('Island 12%', 'Island', 0.12, False),
+    ('Standard 12%', 'Standard', 0.12, False),
+    ('Island Sea 18%', 'Island', 0.18, True),
+    ('Standard Sea 18%', 'Standard', 0.18, True),
+]
+TOURNAMENT_COLS = 4
+TOURNAMENT_SIZE = 16   # ミニ盤面の幅・高さ
+TOURNAMENT_FLUSH = 0.03 # 差分をまとめて送る間隔（秒）
+
+_tournament_queue = None # ワーカープロセス側の送信キュー
+
+def _tournament_init(queue):
+    """ワーカープロセスの初期化: 差分を送り返すキューを受け取る"""
+    global _tournament_queue
+    _tournament_queue = queue
+
+def run_tournament_game(run_id, slot, cfg_index, seed):
+    """
+    ワーカープロセスで1局を解き、盤面の差分を詰めたバイト列だけをキューで送り返す。
+    差分は TOURNAMENT_FLUSH ごとにまとめて送る。
+    """
+    _, strategy, ratio, sea = TOURNAMENT_CONFIGS[cfg_index]
+    q = _tournament_queue
+    pending = []
+    last = time.perf_counter()
+
+    def on_change(changes):
+        nonlocal last
+        pending.extend(changes)
+        now = time.perf_counter()
+        if now - last >= TOURNAMENT_FLUSH:
+            q.put((run_id, slot, 'delta', pack_deltas(pending)))
+            pending.clear()
+            last = now
+
+    q.put((run_id, slot, 'start', None))
+    won, guesses, elapsed = play_bot_game(TOURNAMENT_SIZE, TOURNAMENT_SIZE, ratio, strategy, seed, sea, on_change)
+    if pending:
+        q.put((run_id, slot, 'delta', pack_deltas(pending)))
+    q.put((run_id, slot, 'done', (cfg_index, won, guesses, elapsed)))
@@ -0,0 +1,1375 @@
+import time
+import sys
+import os
+from queue import Empty
+
+# --- PySide6 ライブラリのインポート ---
+# GUI構築に必要なウィジェット群
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+    QLabel, QLineEdit, QPushButton, QFrame, QComboBox, QCheckBox, 
+    QSlider, QGraphicsOpacityEffect, QGroupBox, QTabWidget, QTextEdit, QGridLayout
+)
+# アニメーション、タイマー、座標管理など
+from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QRect, QUrl, QObject, QThread, Signal, Slot
+# 描画（ペン、ブラシ、フォント）
+from PySide6.QtGui import QPainter, QColor, QFont, QPen, QMouseEvent, QKeySequence
+# サウンド再生 (QtMultimedia) は起動を速くするため、初めて鳴らすときに読み込む
+
+_T_IMPORTED = time.perf_counter()
+
+from engine import (
+    FLAGGED, MINE, PATTERN_CACHE, LogicBot, DictBoard, MoveHistory, place_mines, unpack_deltas,
+    TOURNAMENT_CONFIGS, TOURNAMENT_COLS, TOURNAMENT_SIZE, _tournament_init, run_tournament_game,
+)
+
+# ==========================================
+# 言語データ (日本語 / 英語)
+# ==========================================
+TEXTS = {
+    'jp': {
+        'tab_main': 'メイン',
+        'tab_feat': '機能調整',
+        'tab_about': '説明',
+        'lang_btn': 'English',
+        'grp_game': 'ゲーム設定',
+        'lbl_w': '幅 (W)',
+        'lbl_h': '高さ (H)',
+        'lbl_b': '爆弾 (%)',
+        'grp_vis': '表示設定',
+        'lbl_theme': 'テーマ:',
+        'chk_detail': '数字・旗を表示',
+        'grp_bot': 'ボット知能',
+        'lbl_style': '思考:',
+        'style_island': '島攻略 (角優先)',
+        'style_std': '標準 (走査)',
+        'lbl_speed': '速度:',
+        'btn_reset': '適用 / リセット',
+        'btn_undo': '↶ 戻す',
+        'btn_redo': '↷ やり直し',
+        'btn_fork': '分岐 (What-if)',
+        'btn_unfork': '分岐点へ戻る',
+        'lbl_history': '手数: {moves}　分岐: {forks}',
+        'lbl_history_fork': '手数: {moves}　分岐: {forks}（枝 {branches}、分岐後 {since} 手）',
+        'btn_branch': '枝を切替',
+        'status_ready': '開始するにはクリック',
+        'status_ai': '🤖 ロボット思考中...',
+        'status_human': '🤷 あなたの番です',
+        'status_win': '🏆 任務完了 🏆',
+        'status_lose': '💀 ゲームオーバー 💀',
+        'feat_anim': 'アニメーション設定',
+        'lbl_overlay_dur': 'オーバーレイ時間 (ms):',
+        'lbl_overlay_alpha': 'オーバーレイ濃度 (0-255):',
+        'chk_progressive': '広い連鎖を少しずつ開く',
+        'feat_sys': 'システム設定',
+        'chk_sound': '効果音 (Win/Lose)',
+        'tab_tour': '対戦',
+        'btn_tour_start': 'トーナメント開始',
+        'btn_tour_stop': '停止',
+        'tour_head': '設定 / 局数 / 勝率 / 平均ms / 推測',
+        'about_title': 'LuckSweeper マニュアル',
+        'about_text': """
+<h2>遊び方</h2>
+<p>爆弾を避けながら、すべての安全なマスを開けてください。<br>
+最初の1手は必ず安全です。</p>
+
+<h3>テーマについて</h3>
+<ul>
+<li><b>Modern (デフォルト):</b> フラットで見やすい現代的なデザイン。</li>
+<li><b>Sea (海モード):</b> 
+    <ul>
+    <li><b>青 (海):</b> 危険なし (0)</li>
+    <li><b>砂色 (浜):</b> 数字マス (境界)</li>
+    <li><b>緑 (陸):</b> 未探索エリア</li>
+    </ul>
+    ※このモードでは爆弾が島のようにまとまって生成されます。
+</li>
+<li><b>Classic:</b> 懐かしいWindows 95風のデザイン。</li>
+</ul>
+"""
+    },
+    'en': {
+        'tab_main': 'Main',
+        'tab_feat': 'Features',
+        'tab_about': 'About',
+        'lang_btn': '日本語',
+        'grp_game': 'Game Settings',
+        'lbl_w': 'Width',
+        'lbl_h': 'Height',
+        'lbl_b': 'Mines (%)',
+        'grp_vis': 'Visuals',
+        'lbl_theme': 'Theme:',
+        'chk_detail': 'Show Numbers/Flags',
+        'grp_bot': 'Bot Intelligence',
+        'lbl_style': 'Style:',
+        'style_island': 'Island (Corner)',
+        'style_std': 'Standard (Scan)',
+        'lbl_speed': 'Speed:',
+        'btn_reset': 'APPLY / RESET',
+        'btn_undo': '↶ Undo',
+        'btn_redo': '↷ Redo',
+        'btn_fork': 'Fork (What-if)',
+        'btn_unfork': 'Back to Fork',
+        'lbl_history': 'Moves: {moves}  Forks: {forks}',
+        'lbl_history_fork': 'Moves: {moves}  Forks: {forks} ({branches} branches, {since} since fork)',
+        'btn_branch': 'Switch Branch',
+        'status_ready': 'Click to Start',
+        'status_ai': '🤖 Bot Thinking...',
+        'status_human': '🤷 Human Turn',
+        'status_win': '🏆 MISSION PASSED 🏆',
+        'status_lose': '💀 WASTED 💀',
+        'feat_anim': 'Animation Tweaks',
+        'lbl_overlay_dur': 'Overlay Duration (ms):',
+        'lbl_overlay_alpha': 'Overlay Alpha (0-255):',
+        'chk_progressive': 'Progressive Reveal (Large Openings)',
+        'feat_sys': 'System Tweaks',
+        'chk_sound': 'Sound Effects',
+        'tab_tour': 'Tournament',
+        'btn_tour_start': 'Start Tournament',
+        'btn_tour_stop': 'Stop',
+        'tour_head': 'Config / Games / Win% / Avg ms / Guesses',
+        'about_title': 'LuckSweeper Manual',
+        'about_text': """
+<h2>How to Play</h2>
+<p>Reveal all safe squares without detonating a mine.<br>
+The first click is always safe.</p>
+
+<h3>Themes</h3>
+<ul>
+<li><b>Modern (Default):</b> Clean, flat design.</li>
+<li><b>Sea Mode:</b> 
+    <ul>
+    <li><b>Blue:</b> Safe Sea (0)</li>
+    <li><b>Sand:</b> Beach (Numbers)</li>
+    <li><b>Green:</b> Unexplored Land</li>
+    </ul>
+    *Mines are clustered like islands in this mode.
+</li>
+<li><b>Classic:</b> Retro Windows 95 style.</li>
+</ul>
+"""
+    }
+}
+
+# ==========================================
+# サウンド管理クラス
+# ==========================================
+class SoundManager:
+    """
+    音声ファイルの読み込みと再生を担当。
+    ファイルが存在しない場合は標準ビープ音で代用する安全設計。
+    """
+    def __init__(self):
+        self.muted = False
+        self.effects = None # 初めて鳴らすときに読み込む
+
+    def load_sounds(self):
+        # 同じフォルダにあるwavファイルを読み込む
+        self.effects = {}
+        self.load_sound('win', 'win.wav')
+        self.load_sound('lose', 'lose.wav')
+
+    def load_sound(self, name, filename):
+        if os.path.exists(filename):
+            from PySide6.QtMultimedia import QSoundEffect
+            effect = QSoundEffect()
+            effect.setSource(QUrl.fromLocalFile(filename))
+            self.effects[name] = effect
+        else:
+            self.effects[name] = None # ファイルがない場合
+
+    def play(self, name):
+        if self.muted: return
+        if self.effects is None: self.load_sounds()
+        
+        # 音声ファイルがあれば再生、なければビープ音
+        if name in self.effects and self.effects[name]:
+            self.effects[name].play()
+        else:
+            if name in ['win', 'lose']: 
+                QApplication.beep()
+
+# ==========================================
+# ボット思考ワーカー (別スレッド)
+# ==========================================
+class SolverWorker(QObject):
+    """
+    LogicBot を GUI スレッドの外 (QThread) で動かすワーカー。
+    ボットの盤面はこのスレッド専用のミラーで、GUI 側からは不変のタプルで差分だけが届く。
+    要求と結果には世代番号を付け、リセット後に届いた古い要求・結果は捨てる。
+    """
+    move_ready = Signal(int, object) # (世代, (種類, インデックス) または None)
+
+    def __init__(self):
+        super().__init__()
+        self.gen = -1
+        self.bot = None
+
+    @Slot(int, int, int)
+    def reset(self, gen, w, h):
+        self.gen = gen
+        self.bot = LogicBot(w, h)
+
+    @Slot(int, object, object)
+    def apply(self, gen, opened, flags):
+        if gen != self.gen: return
+        self.bot.reveal(opened)
+        for i in flags:
+            self.bot.flag(i)
+
+    @Slot(int, str)
+    def solve(self, gen, strategy):
+        if gen != self.gen: return
+        self.move_ready.emit(gen, self.bot.next_action(strategy))
+
+# ==========================================
+# ゲーム盤面ウィジェット (描画担当)
+# ==========================================
+class BoardWidget(QWidget):
+    """
+    マインスイーパのグリッドを描画するカスタムウィジェット。
+    ボタンを大量に配置すると重くなるため、QPainterですべて描画する方式を採用。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True) # マウス移動イベントを検知可能に
+        self.parent_logic = None    # 親ウィンドウ（ロジック）への参照
+        
+        # グリッド設定
+        self.grid_w = 20
+        self.grid_h = 20
+        self.cells = []      # セルデータの2次元配列
+        self.cell_size = 20  # 1マスのピクセルサイズ（動的に変化）
+        self.offset_x = 0    # 描画開始位置X（中央寄せ用）
+        self.offset_y = 0    # 描画開始位置Y
+        
+        # 表示設定
+        self.theme = 'Modern' 
+        self.show_details = True # 数字や旗を表示するかどうか
+        
+        # アニメーション設定
+        self.overlay_anim_duration = 500
+        self.overlay_alpha_max = 200
+        self.on_first_paint = None # 盤面を初めて描画したときに1度だけ呼ぶ（起動計測用）
+        
+        # --- カラーパレット定義 ---
+        self.colors = {
+            'Sea': { # 海モード
+                'bg': QColor('#2c3e50'),       # 背景（深海色）
+                'sea': QColor('#2980b9'),      # 0のマス（海）
+                'sand': QColor('#e6d0a1'),     # 数字マス（砂浜）
+                'land': QColor('#27ae60'),     # 未開放（陸）
+                'mine_bg': QColor('#c0392b'),  # 爆発時の赤
+                'text_base': QColor('#5d4037') # 砂浜上の文字色
+            },
+            'Modern': { # モダンモード（フラット）
+                'bg': QColor('#222'),
+                'sea': QColor('#fff'),
+                'sand': QColor('#fff'),
+                'land': QColor('#ddd'),
+                'mine_bg': QColor('#e74c3c'),
+                'text_base': Qt.black
+            },
+            'Classic': { # クラシック（Windows95風）
+                'bg': QColor('#c0c0c0'),
+                'sea': QColor('#c0c0c0'),
+                'sand': QColor('#c0c0c0'),
+                'land': QColor('#c0c0c0'),
+                'mine_bg': QColor('red'),
+                'text_base': Qt.black
+            }
+        }
+        # 数字ごとの色（1=青, 2=緑...）
+        self.num_colors = [Qt.black, QColor('#0000FF'), QColor('#008000'), QColor('#FF0000'),
+                           QColor('#000080'), QColor('#800000'), QColor('#008080'), Qt.black]
+
+        # --- GTA風オーバーレイ ("WASTED") ---
+        self.overlay_label = QLabel(self)
+        self.overlay_label.setAlignment(Qt.AlignCenter) # 画面中央にテキスト配置
+        self.overlay_label.setFont(QFont('Impact', 60, QFont.Bold))
+        self.overlay_label.hide()
+        
+        # フェードインアニメーション用エフェクト
+        self.opacity_effect = QGraphicsOpacityEffect(self.overlay_label)
+        self.overlay_label.setGraphicsEffect(self.opacity_effect)
+        self.anim = QPropertyAnimation(self.opacity_effect, b"opacity")
+
+    def set_grid_size(self, w, h):
+        """グリッドサイズ変更時の更新処理"""
+        self.grid_w = w
+        self.grid_h = h
+        self.update() # 再描画リクエスト
+
+    def show_overlay(self, text, color_hex):
+        """GTA風メッセージを表示する"""
+        self.overlay_label.setText(text)
+        # 背景を半透明の黒、文字色を指定
+        self.overlay_label.setStyleSheet(f"color: {color_hex}; background-color: rgba(0,0,0,{self.overlay_alpha_max});")
+        
+        # 画面全体を覆うようにリサイズ
+        self.resize_overlay()
+        
+        self.overlay_label.show()
+        self.overlay_label.raise_() # 最前面へ
+        
+        # アニメーション開始
+        self.anim.setDuration(self.overlay_anim_duration)
+        self.anim.setStartValue(0.0)
+        self.anim.setEndValue(1.0)
+        self.anim.start()
+
+    def hide_overlay(self):
+        self.overlay_label.hide()
+
+    def resizeEvent(self, event):
+        """ウィンドウサイズ変更時に呼ばれる"""
+        self.resize_overlay()
+        super().resizeEvent(event)
+        
+    def resize_overlay(self):
+        """オーバーレイを常に画面全体に合わせる"""
+        if self.overlay_label:
+            self.overlay_label.resize(self.width(), self.height())
+            self.overlay_label.move(0, 0)
+
+    def paintEvent(self, event):
+        """
+        【重要】描画処理のメイン部分
+        ここでマス目、数字、爆弾などをすべて描画する
+        """
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing, False) # ドット感を出すためアンチエイリアスOFF
+        
+        # 背景塗りつぶし
+        theme_cols = self.colors.get(self.theme, self.colors['Modern'])
+        painter.fillRect(self.rect(), theme_cols['bg'])
+        
+        if not self.cells: return
+
+        # --- アスペクト比 1:1 の計算 ---
+        avail_w = self.width()
+        avail_h = self.height()
+        padding = 10
+        
+        # 縦横どちらが制限になるか計算して、セルサイズを決定
+        sz_w = (avail_w - padding * 2) / self.grid_w
+        sz_h = (avail_h - padding * 2) / self.grid_h
+        self.cell_size = int(min(sz_w, sz_h))
+        if self.cell_size < 1: self.cell_size = 1
+        
+        # 全体のサイズから描画開始位置（オフセット）を計算して中央寄せ
+        total_w = self.cell_size * self.grid_w
+        total_h = self.cell_size * self.grid_h
+        self.offset_x = (avail_w - total_w) // 2
+        self.offset_y = (avail_h - total_h) // 2
+        
+        # フォントサイズ調整
+        font_size = int(self.cell_size * 0.6)
+        font_fam = "Courier New" if self.theme == 'Classic' else "Arial"
+        font = QFont(font_fam, font_size, QFont.Bold)
+        painter.setFont(font)
+        
+        # --- セル描画ループ（再描画が必要な範囲のセルだけ） ---
+        r = event.rect()
+        s = self.cell_size
+        x0 = max(0, (r.left() - self.offset_x) // s)
+        x1 = min(self.grid_w, (r.right() - self.offset_x) // s + 1)
+        y0 = max(0, (r.top() - self.offset_y) // s)
+        y1 = min(self.grid_h, (r.bottom() - self.offset_y) // s + 1)
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                cell = self.cells[y][x]
+                rx = self.offset_x + x * self.cell_size
+                ry = self.offset_y + y * self.cell_size
+                size = self.cell_size
+                
+                if self.theme == 'Classic':
+                    self.draw_classic(painter, rx, ry, size, cell, theme_cols, font_size)
+                else:
+                    self.draw_modern_sea(painter, rx, ry, size, cell, theme_cols, font_size)
+        
+        if self.on_first_paint:
+            callback, self.on_first_paint = self.on_first_paint, None
+            callback()
+
+    def update_cells(self, changes):
+        """変化したマス [(インデックス, ...), ...] を囲む矩形だけを再描画する"""
+        if not changes: return
+        w = self.grid_w
+        xs = [i % w for i, _ in changes]
+        ys = [i // w for i, _ in changes]
+        s = self.cell_size
+        self.update(QRect(self.offset_x + min(xs) * s, self.offset_y + min(ys) * s,
+                          (max(xs) - min(xs) + 1) * s, (max(ys) - min(ys) + 1) * s))
+
+    def draw_modern_sea(self, p, x, y, s, cell, cols, fs):
+        """モダン / 海モードの描画"""
+        gap = 0 if s < 5 else 1 # 小さすぎる時は隙間をなくす
+        rect = QRect(x, y, s - gap, s - gap)
+        
+        if cell['revealed']:
+            if cell['is_mine']:
+                # 爆弾表示
+                p.fillRect(rect, cols['mine_bg'])
+                if self.show_details and fs > 4:
+                    p.setPen(Qt.white)
+                    p.drawText(rect, Qt.AlignCenter, "💣")
+            else:
+                # 海モードなら0は海色、数字は砂色にする
+                if self.theme == 'Sea':
+                    bg = cols['sea'] if cell['neighbor'] == 0 else cols['sand']
+                else:
+                    bg = cols['sand']
+                p.fillRect(rect, bg)
+                
+                # 数字描画
+                if self.show_details and cell['neighbor'] > 0 and fs > 4:
+                    if self.theme == 'Sea':
+                        p.setPen(cols['text_base'])
+                    else:
+                        idx = cell['neighbor']
+                        p.setPen(self.num_colors[idx] if idx < 8 else Qt.black)
+                    p.drawText(rect, Qt.AlignCenter, str(cell['neighbor']))
+        else:
+            # 未開放セル（陸地）
+            p.fillRect(rect, cols['land'])
+            if self.show_details and cell['flagged'] and fs > 4:
+                p.setPen(Qt.red)
+                p.drawText(rect, Qt.AlignCenter, "🚩")
+
+    def draw_classic(self, p, x, y, s, cell, cols, fs):
+        """クラシックモード（立体的）の描画"""
+        rect = QRect(x, y, s, s)
+        if cell['revealed']:
+            p.fillRect(rect, cols['sand'])
+            p.setPen(QPen(QColor('gray'), 1))
+            p.drawRect(x, y, s, s) # へこんだ枠線
+            if cell['is_mine']:
+                p.fillRect(QRect(x+1, y+1, s-2, s-2), cols['mine_bg'])
+                if self.show_details and fs > 4:
+                    p.setPen(Qt.black)
+                    p.drawText(rect, Qt.AlignCenter, "*")
+            elif self.show_details and cell['neighbor'] > 0 and fs > 4:
+                idx = cell['neighbor']
+                p.setPen(self.num_colors[idx] if idx < 8 else Qt.black)
+                p.drawText(rect, Qt.AlignCenter, str(cell['neighbor']))
+        else:
+            p.fillRect(rect, cols['land'])
+            # 3Dベベル（出っ張り）表現
+            p.fillRect(x, y, s, 2, Qt.white)      # 上ハイライト
+            p.fillRect(x, y, 2, s, Qt.white)      # 左ハイライト
+            p.fillRect(x, y+s-2, s, 2, Qt.darkGray) # 下シャドウ
+            p.fillRect(x+s-2, y, 2, s, Qt.darkGray) # 右シャドウ
+            if self.show_details and cell['flagged'] and fs > 4:
+                p.setPen(Qt.red)
+                p.drawText(rect, Qt.AlignCenter, "P")
+
+    def mousePressEvent(self, event: QMouseEvent):
+        """クリックされた座標をグリッド座標に変換して通知"""
+        if self.parent_logic:
+            x = int((event.position().x() - self.offset_x) // self.cell_size)
+            y = int((event.position().y() - self.offset_y) // self.cell_size)
+            # 有効範囲内なら処理へ
+            if 0 <= x < self.grid_w and 0 <= y < self.grid_h:
+                self.parent_logic.on_cell_clicked(x, y)
+
+# ==========================================
+# トーナメント (マルチプロセス)
+# ==========================================
+# 対局はワーカープロセスで engine.run_tournament_game が解き、ここでは差分を受け取って表示する
+class TournamentTab(QWidget):
+    """
+    ミニ盤面を並べ、盤面ごとに別プロセスでボットを走らせるタブ。
+    プロセスからは詰めた差分だけが届き、ここでミニ盤面に反映して勝率と解答時間を集計する。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = None
+        self.queue = None
+        self.run_id = 0
+        self.running = False
+        self.texts = TEXTS['jp']
+        self.reset_stats()
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        self.btn_run = QPushButton()
+        self.btn_run.setCursor(Qt.PointingHandCursor)
+        self.btn_run.clicked.connect(self.toggle_run)
+        layout.addWidget(self.btn_run)
+        
+        # ミニ盤面の壁（クリック不可・数字なし）
+        grid = QGridLayout()
+        grid.setSpacing(2)
+        self.boards = []
+        self.flats = []
+        for r in range(len(TOURNAMENT_CONFIGS)):
+            for c in range(TOURNAMENT_COLS):
+                bw = BoardWidget()
+                bw.show_details = False
+                bw.setMinimumSize(60, 60)
+                bw.set_grid_size(TOURNAMENT_SIZE, TOURNAMENT_SIZE)
+                grid.addWidget(bw, r, c)
+                self.boards.append(bw)
+                self.flats.append([])
+        layout.addLayout(grid)
+        
+        self.lbl_stats = QLabel()
+        self.lbl_stats.setFont(QFont('Courier New', 8))
+        self.lbl_stats.setWordWrap(True)
+        layout.addWidget(self.lbl_stats)
+        layout.addStretch()
+        
+        # 差分キューの受信タイマー
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(30)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def reset_stats(self):
+        # 設定ごとの [局数, 勝ち数, 合計秒, 推測回数]
+        self.stats = [[0, 0, 0.0, 0] for _ in TOURNAMENT_CONFIGS]
+        self.next_seed = [0] * len(TOURNAMENT_CONFIGS)
+
+    def update_texts(self, t):
+        self.texts = t
+        self.btn_run.setText(t['btn_tour_stop'] if self.running else t['btn_tour_start'])
+        self.update_stats()
+
+    def toggle_run(self):
+        if self.running: self.stop()
+        else: self.start()
+
+    def start(self):
+        """プロセスプールを立ち上げ、全スロットに1局ずつ投入する"""
+        self.run_id += 1
+        self.running = True
+        self.reset_stats()
+        # multiprocessing は重いので、トーナメントを始めるときに読み込む
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        ctx = multiprocessing.get_context('spawn') # Qtを抱えたままforkしないようにspawnで起動
+        self.queue = ctx.Queue()
+        workers = min(len(self.boards), os.cpu_count() or 1)
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                        initializer=_tournament_init, initargs=(self.queue,))
+        for slot in range(len(self.boards)):
+            self.submit_next(slot)
+        self.poll_timer.start()
+        self.update_texts(self.texts)
+
+    def stop(self):
+        """未着手の対局を取り消してプールを閉じる（統計と盤面はそのまま残す）"""
+        if not self.running: return
+        self.running = False
+        self.poll_timer.stop()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = None
+        self.update_texts(self.texts)
+
+    def submit_next(self, slot):
+        cfg = slot // TOURNAMENT_COLS
+        seed = self.next_seed[cfg]
+        self.next_seed[cfg] += 1
+        self.pool.submit(run_tournament_game, self.run_id, slot, cfg, seed)
+
+    def poll(self):
+        """届いた差分をミニ盤面に反映し、終わった盤面には次の対局を投入する"""
+        changed = set()
+        for _ in range(2000): # 1回の受信で処理する上限（UIを止めないため）
+            try:
+                run_id, slot, kind, payload = self.queue.get_nowait()
+            except Empty:
+                break
+            if run_id != self.run_id: continue
+            if kind == 'start':
+                bw = self.boards[slot]
+                bw.cells = [[{'is_mine': False, 'revealed': False, 'flagged': False, 'neighbor': 0}
+                             for _ in range(TOURNAMENT_SIZE)] for _ in range(TOURNAMENT_SIZE)]
+                self.flats[slot] = [c for row in bw.cells for c in row]
+            elif kind == 'delta':
+                flat = self.flats[slot]
+                for i, code in unpack_deltas(payload):
+                    cell = flat[i]
+                    if code == FLAGGED:
+                        cell['flagged'] = True
+                    elif code == MINE:
+                        cell['revealed'] = cell['is_mine'] = True
+                    else:
+                        cell['revealed'] = True
+                        cell['neighbor'] = code
+            elif kind == 'done':
+                cfg, won, guesses, elapsed = payload
+                st = self.stats[cfg]
+                st[0] += 1
+                st[1] += won
+                st[2] += elapsed
+                st[3] += guesses
+                if self.running: self.submit_next(slot)
+            changed.add(slot)
+        for slot in changed:
+            self.boards[slot].update()
+        if changed: self.update_stats()
+
+    def update_stats(self):
+        lines = [self.texts['tour_head']]
+        for (name, *_), (games, wins, total, guesses) in zip(TOURNAMENT_CONFIGS, self.stats):
+            n = max(games, 1)
+            lines.append(f"{name:<17}{games:>6} {100 * wins / n:5.1f}% {1000 * total / n:6.2f} {guesses / n:5.2f}")
+        self.lbl_stats.setText("\n".join(lines))
+
+# ==========================================
+# メインウィンドウ (ゲームロジック)
+# ==========================================
+class LuckSweeperWindow(QMainWindow):
+    # ボットワーカーへの通知（別スレッドへはキュー接続で届く）
+    solver_reset = Signal(int, int, int)
+    solver_apply = Signal(int, object, object)
+    solver_request = Signal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("LuckSweeper")
+        self.resize(1200, 750)
+        
+        self.current_lang = 'jp'
+        self.sound_manager = SoundManager()
+        
+        # ゲームステート初期値
+        self.grid_w = 20
+        self.grid_h = 20
+        self.bomb_ratio = 0.15
+        self.bot_delay = 100
+        self.bot_strategy = 'Island' # ボットの戦略
+        self.game_over = False
+        self.is_thinking = False
+        self.num_mines = 0
+        self.board = None       # 現在のゲームの DictBoard
+        self.history = MoveHistory()
+        self.move_changes = []  # 今の手で変化したマス（手の終わりに履歴へ積む）
+        self.game_result = None # 'win' / 'lose'
+        
+        # ボット思考は別スレッドで行い、結果だけをGUIスレッドで盤面に反映する
+        self.solver_gen = 0     # リセットのたびに進め、古い思考結果を捨てる
+        self.solver_thread = QThread(self)
+        self.solver = SolverWorker()
+        self.solver.moveToThread(self.solver_thread)
+        self.solver_reset.connect(self.solver.reset)
+        self.solver_apply.connect(self.solver.apply)
+        self.solver_request.connect(self.solver.solve)
+        self.solver.move_ready.connect(self.on_move_ready)
+        self.solver_thread.start()
+        
+        # 次の一手までの待ち時間タイマー（リセットで止められるように単発タイマーを保持）
+        self.bot_timer = QTimer(self)
+        self.bot_timer.setSingleShot(True)
+        self.bot_timer.timeout.connect(self.auto_step)
+        
+        # 広い連鎖を1フレームずつ開くためのタイマー
+        self.progressive_reveal = True
+        self.reveal_budget_ms = 8   # 1フレームで連鎖開放に使う時間
+        self.reveal_job = None      # 開いている途中の (reveal_iter, 開き終わった後の処理)
+        self.reveal_timer = QTimer(self)
+        self.reveal_timer.setInterval(16)
+        self.reveal_timer.timeout.connect(self.continue_reveal)
+        
+        self.init_ui()
+        
+        # 起動直後にゲームを開始（最初の描画から盤面を操作できるよう同期的に作る）
+        self.restart_game()
+        self.update_texts() # 言語反映
+
+    def init_ui(self):
+        """UIコンポーネントの配置"""
+        central = QWidget()
+        self.setCentralWidget(central)
+        layout = QHBoxLayout(central)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        
+        # 左側：ゲーム盤面
+        self.board_view = BoardWidget()
+        self.board_view.parent_logic = self
+        layout.addWidget(self.board_view, stretch=1) # 伸縮可能にする
+        
+        # 右側：タブパネル
+        self.tabs = QTabWidget()
+        self.tabs.setFixedWidth(300)
+        # タブのスタイルシート設定
+        self.tabs.setStyleSheet("""
+            QTabWidget::pane { border: 0; background: #f5f5f5; }
+            QTabBar::tab { background: #ddd; padding: 8px 20px; border-bottom: 2px solid #ccc; }
+            QTabBar::tab:selected { background: #f5f5f5; border-bottom: 2px solid #3498db; }
+        """)
+        layout.addWidget(self.tabs)
+        
+        # --- タブ1: メイン設定 ---
+        self.tab_main = QWidget()
+        self.tabs.addTab(self.tab_main, "")
+        ml = QVBoxLayout(self.tab_main)
+        ml.setSpacing(15)
+        ml.setContentsMargins(20, 20, 20, 20)
+        
+        # 言語切替ボタン
+        self.btn_lang = QPushButton("English")
+        self.btn_lang.setCursor(Qt.PointingHandCursor)
+        self.btn_lang.clicked.connect(self.toggle_language)
+        ml.addWidget(self.btn_lang)
+
+        # ゲーム設定グループ（幅・高さ・爆弾）
+        self.grp_game = QGroupBox()
+        gl = QVBoxLayout(self.grp_game)
+        self.tf_w = self.create_input(gl, "lbl_w", 20)
+        self.tf_h = self.create_input(gl, "lbl_h", 20)
+        self.tf_b = self.create_input(gl, "lbl_b", 15)
+        ml.addWidget(self.grp_game)
+        
+        # 表示設定グループ
+        self.grp_vis = QGroupBox()
+        vl = QVBoxLayout(self.grp_vis)
+        self.lbl_theme = QLabel()
+        vl.addWidget(self.lbl_theme)
+        self.combo_theme = QComboBox()
+        self.combo_theme.addItems(["Modern", "Sea", "Classic"])
+        self.combo_theme.currentTextChanged.connect(self.change_theme)
+        vl.addWidget(self.combo_theme)
+        self.chk_detail = QCheckBox()
+        self.chk_detail.setChecked(True)
+        self.chk_detail.toggled.connect(self.toggle_details)
+        vl.addWidget(self.chk_detail)
+        ml.addWidget(self.grp_vis)
+        
+        # ボット設定グループ
+        self.grp_bot = QGroupBox()
+        bl = QVBoxLayout(self.grp_bot)
+        self.lbl_style = QLabel()
+        bl.addWidget(self.lbl_style)
+        self.combo_style = QComboBox()
+        self.combo_style.addItems(["Island", "Standard"]) 
+        self.combo_style.currentTextChanged.connect(self.change_style)
+        bl.addWidget(self.combo_style)
+        
+        self.lbl_speed = QLabel()
+        bl.addWidget(self.lbl_speed)
+        self.slider_speed = QSlider(Qt.Horizontal)
+        self.slider_speed.setRange(10, 800)
+        self.slider_speed.setValue(self.bot_delay)
+        self.slider_speed.setInvertedAppearance(True) # 左＝遅い、右＝速い（delay小）に見せるため反転
+        self.slider_speed.valueChanged.connect(self.change_speed)
+        bl.addWidget(self.slider_speed)
+        ml.addWidget(self.grp_bot)
+        
+        # リセットボタン
+        self.btn_reset = QPushButton()
+        self.btn_reset.setStyleSheet("background-color: #2c3e50; color: white; padding: 15px; font-weight: bold; border-radius: 5px;")
+        self.btn_reset.clicked.connect(self.restart_game)
+        ml.addWidget(self.btn_reset)
+        
+        # 履歴（元に戻す / やり直し / what-if 分岐）
+        hl = QHBoxLayout()
+        self.btn_undo = QPushButton()
+        self.btn_undo.setShortcut(QKeySequence.Undo)
+        self.btn_undo.clicked.connect(self.undo_move)
+        hl.addWidget(self.btn_undo)
+        self.btn_redo = QPushButton()
+        self.btn_redo.setShortcut(QKeySequence.Redo)
+        self.btn_redo.clicked.connect(self.redo_move)
+        hl.addWidget(self.btn_redo)
+        ml.addLayout(hl)
+        fkl = QHBoxLayout()
+        self.btn_fork = QPushButton()
+        self.btn_fork.clicked.connect(self.fork_branch)
+        fkl.addWidget(self.btn_fork)
+        self.btn_unfork = QPushButton()
+        self.btn_unfork.clicked.connect(self.back_to_fork)
+        fkl.addWidget(self.btn_unfork)
+        self.btn_branch = QPushButton()
+        self.btn_branch.clicked.connect(self.switch_branch)
+        fkl.addWidget(self.btn_branch)
+        ml.addLayout(fkl)
+        self.lbl_history = QLabel()
+        self.lbl_history.setAlignment(Qt.AlignCenter)
+        ml.addWidget(self.lbl_history)
+        
+        ml.addStretch()
+        # ステータスバー
+        self.status_bar = QLabel()
+        self.status_bar.setAlignment(Qt.AlignCenter)
+        self.status_bar.setWordWrap(True)
+        self.status_bar.setStyleSheet("background-color: #e0e0e0; padding: 10px; border-radius: 5px; color: #333;")
+        ml.addWidget(self.status_bar)
+
+        # --- タブ2〜4: 中身は初めて開かれたときに作る（起動高速化） ---
+        self.tab_feat = QWidget()
+        self.tabs.addTab(self.tab_feat, "")
+        self.tab_about = QWidget()
+        self.tabs.addTab(self.tab_about, "")
+        self.tab_tour = QWidget()
+        self.tabs.addTab(self.tab_tour, "")
+        self.grp_anim = self.tf_overlay_dur = self.tf_overlay_alpha = None
+        self.grp_sys = self.chk_sound = None
+        self.chk_progressive = None
+        self.txt_about = None
+        self.tour = None
+        self.tab_builders = {1: self.build_feat_tab, 2: self.build_about_tab, 3: self.build_tour_tab}
+        self.tabs.currentChanged.connect(self.ensure_tab)
+
+    def ensure_tab(self, index):
+        """タブが初めて選ばれたときに中身を作り、現在の言語で文言を入れる"""
+        builder = self.tab_builders.pop(index, None)
+        if builder:
+            builder()
+            self.update_texts()
+
+    def build_feat_tab(self):
+        """タブ2: 機能調整"""
+        fl = QVBoxLayout(self.tab_feat)
+        fl.setSpacing(20)
+        
+        # アニメーション調整
+        self.grp_anim = QGroupBox()
+        al = QVBoxLayout(self.grp_anim)
+        self.tf_overlay_dur = self.create_input(al, "lbl_overlay_dur", self.board_view.overlay_anim_duration)
+        self.tf_overlay_alpha = self.create_input(al, "lbl_overlay_alpha", self.board_view.overlay_alpha_max)
+        self.chk_progressive = QCheckBox()
+        self.chk_progressive.setChecked(self.progressive_reveal)
+        self.chk_progressive.toggled.connect(self.toggle_progressive)
+        al.addWidget(self.chk_progressive)
+        fl.addWidget(self.grp_anim)
+        
+        # システム設定（音）
+        self.grp_sys = QGroupBox()
+        sl = QVBoxLayout(self.grp_sys)
+        self.chk_sound = QCheckBox()
+        self.chk_sound.setChecked(not self.sound_manager.muted)
+        self.chk_sound.toggled.connect(self.toggle_sound)
+        sl.addWidget(self.chk_sound)
+        fl.addWidget(self.grp_sys)
+        
+        fl.addStretch()
+
+    def build_about_tab(self):
+        """タブ3: 説明"""
+        ab_l = QVBoxLayout(self.tab_about)
+        self.txt_about = QTextEdit()
+        self.txt_about.setReadOnly(True)
+        self.txt_about.setStyleSheet("background: transparent; border: none;")
+        ab_l.addWidget(self.txt_about)
+
+    def build_tour_tab(self):
+        """タブ4: トーナメント"""
+        tl = QVBoxLayout(self.tab_tour)
+        tl.setContentsMargins(0, 0, 0, 0)
+        self.tour = TournamentTab()
+        tl.addWidget(self.tour)
+
+    def create_input(self, layout, text_key, default_val):
+        """ラベルと入力欄のセットを作成するヘルパー関数"""
+        row = QHBoxLayout()
+        lbl = QLabel()
+        lbl.setProperty('key', text_key) # 言語切り替え用にキーを保持
+        tf = QLineEdit(str(default_val))
+        tf.setAlignment(Qt.AlignCenter)
+        row.addWidget(lbl)
+        row.addWidget(tf)
+        layout.addLayout(row)
+        if not hasattr(self, 'dynamic_labels'): self.dynamic_labels = []
+        self.dynamic_labels.append(lbl)
+        return tf
+
+    def toggle_language(self):
+        """日本語/英語の切り替え"""
+        self.current_lang = 'en' if self.current_lang == 'jp' else 'jp'
+        self.update_texts()
+
+    def update_texts(self):
+        """現在の言語設定に合わせてUIのテキストを更新"""
+        t = TEXTS[self.current_lang]
+        
+        self.tabs.setTabText(0, t['tab_main'])
+        self.tabs.setTabText(1, t['tab_feat'])
+        self.tabs.setTabText(2, t['tab_about'])
+        self.tabs.setTabText(3, t['tab_tour'])
+        self.btn_lang.setText(t['lang_btn'])
+        self.grp_game.setTitle(t['grp_game'])
+        self.grp_vis.setTitle(t['grp_vis'])
+        self.grp_bot.setTitle(t['grp_bot'])
+        
+        self.lbl_theme.setText(t['lbl_theme'])
+        self.chk_detail.setText(t['chk_detail'])
+        self.lbl_style.setText(t['lbl_style'])
+        
+        # コンボボックスの中身も更新（選択位置は維持）
+        idx = self.combo_style.currentIndex()
+        self.combo_style.blockSignals(True)
+        self.combo_style.clear()
+        self.combo_style.addItems([t['style_island'], t['style_std']])
+        self.combo_style.setCurrentIndex(idx)
+        self.combo_style.blockSignals(False)
+        
+        self.lbl_speed.setText(f"{t['lbl_speed']} {self.bot_delay}ms")
+        self.btn_reset.setText(t['btn_reset'])
+        self.btn_undo.setText(t['btn_undo'])
+        self.btn_redo.setText(t['btn_redo'])
+        self.btn_fork.setText(t['btn_fork'])
+        self.btn_unfork.setText(t['btn_unfork'])
+        self.btn_branch.setText(t['btn_branch'])
+        self.update_history_ui()
+        
+        # 遅延生成したタブは作られていれば更新
+        if self.grp_anim is not None:
+            self.grp_anim.setTitle(t['feat_anim'])
+            self.grp_sys.setTitle(t['feat_sys'])
+            self.chk_sound.setText(t['chk_sound'])
+            self.chk_progressive.setText(t['chk_progressive'])
+        if self.txt_about is not None:
+            self.txt_about.setHtml(t['about_text'])
+        if self.tour is not None:
+            self.tour.update_texts(t)
+        
+        # 動的に生成したラベルの更新
+        for lbl in self.dynamic_labels:
+            key = lbl.property('key')
+            if key and key in t:
+                lbl.setText(t[key])
+                
+        # ステータスバーの更新（ゲーム進行状況によって分岐）
+        if self.game_over:
+            pass # ゲームオーバー時のテキストはそのまま
+        elif self.is_thinking:
+            self.status_bar.setText(t['status_ai'])
+        else:
+            self.status_bar.setText(t['status_human'])
+
+    # --- UIイベントハンドラ ---
+    def change_theme(self, text):
+        self.board_view.theme = text
+        self.board_view.update()
+
+    def toggle_details(self, checked):
+        self.board_view.show_details = checked
+        self.board_view.update()
+
+    def toggle_sound(self, checked):
+        self.sound_manager.muted = not checked
+
+    def toggle_progressive(self, checked):
+        self.progressive_reveal = checked
+
+    def change_style(self, text):
+        idx = self.combo_style.currentIndex()
+        self.bot_strategy = 'Island' if idx == 0 else 'Standard'
+
+    def change_speed(self, val):
+        self.bot_delay = val
+        t = TEXTS[self.current_lang]
+        self.lbl_speed.setText(f"{t['lbl_speed']} {val}ms")
+
+    def update_status(self, mode):
+        """ステータスバーの色と文字を更新"""
+        t = TEXTS[self.current_lang]
+        s = self.status_bar
+        if mode == 'ai':
+            s.setText(t['status_ai'])
+            s.setStyleSheet("background-color: #3498db; color: white; padding: 10px; border-radius: 5px;")
+        elif mode == 'human':
+            s.setText(t['status_human'])
+            s.setStyleSheet("background-color: #f1c40f; color: black; padding: 10px; border-radius: 5px;")
+        elif mode == 'ready':
+            s.setText(t['status_ready'])
+            s.setStyleSheet("background-color: #2ecc71; color: white; padding: 10px; border-radius: 5px;")
+        elif mode == 'win':
+            s.setText(t['status_win'])
+            s.setStyleSheet("background-color: white; color: black; border: 2px solid #2ecc71; padding: 10px; border-radius: 5px;")
+        elif mode == 'lose':
+            s.setText(t['status_lose'])
+            s.setStyleSheet("background-color: black; color: red; padding: 10px; border-radius: 5px;")
+
+    def restart_game(self):
+        """ゲームのリセット・開始処理"""
+        # メイン設定の読み込み
+        try:
+            w = int(self.tf_w.text())
+            h = int(self.tf_h.text())
+            b = int(self.tf_b.text())
+            # 範囲制限（クラッシュ防止のため上限128）
+            self.grid_w = max(2, min(w, 128))
+            self.grid_h = max(2, min(h, 128))
+            self.bomb_ratio = max(1, min(b, 99)) / 100.0
+        except: pass
+        
+        # 機能設定の読み込み（機能調整タブが未作成ならデフォルトのまま）
+        if self.tf_overlay_dur is not None:
+            try:
+                dur = int(self.tf_overlay_dur.text())
+                alpha = int(self.tf_overlay_alpha.text())
+                self.board_view.overlay_anim_duration = max(100, dur)
+                self.board_view.overlay_alpha_max = max(0, min(alpha, 255))
+            except: pass
+
+        # 状態リセット（思考中の一手は世代を進めて破棄）
+        self.bot_timer.stop()
+        self.reveal_timer.stop()
+        self.reveal_job = None
+        self.solver_gen += 1
+        self.history = MoveHistory()
+        self.move_changes = []
+        self.game_result = None
+        self.game_over = False
+        self.is_thinking = False
+        self.board_view.hide_overlay()
+        self.board_view.set_grid_size(self.grid_w, self.grid_h)
+        
+        # --- 盤面データの初期化 ---
+        # 海モードなら島生成アルゴリズム、それ以外は完全ランダムで爆弾を配置
+        indices = place_mines(self.grid_w, self.grid_h, self.bomb_ratio, sea=(self.board_view.theme == 'Sea'))
+        self.board = DictBoard(self.grid_w, self.grid_h, indices)
+        self.board_view.cells = self.board.cells
+        self.num_mines = self.board.num_mines
+        self.solver_reset.emit(self.solver_gen, self.grid_w, self.grid_h)
+                    
+        self.update_status('ready')
+        self.update_history_ui()
+        self.board_view.update()
+
+    def on_cell_clicked(self, cx, cy):
+        """セルがクリックされた時の処理"""
+        if self.game_over:
+            self.restart_game()
+            return
+        if self.is_thinking or self.reveal_job: return # ボット思考中・連鎖開放中は無視
+        
+        cell = self.board_view.cells[cy][cx]
+        if cell['revealed'] or cell['flagged']: return
+        
+        self.move_changes = []
+        if cell['is_mine']:
+            # 爆発
+            cell['revealed'] = True
+            self.move_changes.append((cy * self.grid_w + cx, MINE))
+            self.game_over_seq(False)
+            self.commit_move()
+        else:
+            # 安全 -> 周囲をまとめて開き、開き終わったらボットのターンへ
+            self.open_cell(cx, cy, self.after_human_reveal)
+
+    def after_human_reveal(self):
+        self.check_win()
+        self.commit_move()
+        if not self.game_over:
+            # ボットのターンへ移行
+            self.is_thinking = True
+            self.update_status('ai')
+            self.bot_timer.start(self.bot_delay)
+
+    def open_cell(self, x, y, then):
+        """
+        マスを開ける（0なら周囲も連鎖して開く）。
+        段階表示が有効なら1フレームあたり reveal_budget_ms だけ連鎖を進め、その都度新しく開いた帯だけを再描画する。
+        勝利判定やボットの手番は then の中で、すべて開き終わってから行う。
+        """
+        self.reveal_job = (self.board.reveal_iter(y * self.grid_w + x), then)
+        self.continue_reveal()
+
+    def continue_reveal(self):
+        """連鎖開放を時間予算の分だけ進める。開いたマスはボットにも通知する"""
+        steps, then = self.reveal_job
+        deadline = time.perf_counter() + self.reveal_budget_ms / 1000 if self.progressive_reveal else None
+        opened = []
+        done = True
+        for chunk in steps:
+            opened.extend(chunk)
+            if deadline and time.perf_counter() >= deadline:
+                done = False
+                break
+        if opened:
+            self.move_changes.extend(opened)
+            self.solver_apply.emit(self.solver_gen, tuple(opened), ())
+            self.board_view.update_cells(opened)
+        if done:
+            self.reveal_timer.stop()
+            self.reveal_job = None
+            then()
+        elif not self.reveal_timer.isActive():
+            self.reveal_timer.start()
+
+    def set_flag(self, x, y):
+        """ボットがフラグを立てる処理"""
+        if not self.board.flag(y * self.grid_w + x): return
+        self.move_changes.append((y * self.grid_w + x, FLAGGED))
+        self.solver_apply.emit(self.solver_gen, (), (y * self.grid_w + x,))
+        self.check_flags_completion()
+        self.board_view.update_cells([(y * self.grid_w + x, FLAGGED)])
+
+    def check_flags_completion(self):
+        """フラグ数が爆弾数に達したか確認し、すべて正解ならクリア"""
+        if self.board.flag_count >= self.num_mines:
+            all_ok = True
+            for r in self.board_view.cells:
+                for c in r:
+                    # フラグ位置 != 爆弾位置 なら不正解
+                    if c['flagged'] != c['is_mine']:
+                        all_ok = False; break
+            if all_ok: self.game_over_seq(True)
+            else: self.game_over_seq(False)
+
+    def check_win(self):
+        """すべての安全マスが開けられたかチェック"""
+        if self.board.is_won(): self.game_over_seq(True)
+
+    def auto_step(self):
+        """ボットの思考ルーチン（思考自体はワーカースレッドに依頼する）"""
+        if self.game_over or not self.is_thinking: return
+        self.solver_request.emit(self.solver_gen, self.bot_strategy)
+
+    def on_move_ready(self, gen, action):
+        """ワーカーから届いた一手をGUIスレッドで盤面に反映する"""
+        # リセット前に依頼した思考結果は捨てる
+        if gen != self.solver_gen or self.game_over or not self.is_thinking: return
+        
+        if action:
+            kind, i = action
+            x, y = i % self.grid_w, i // self.grid_w
+            self.move_changes = []
+            if kind == 'flag':
+                self.set_flag(x, y)
+                self.after_bot_move()
+            else:
+                self.open_cell(x, y, self.after_bot_move)
+        else:
+            # 手詰まり -> 人間にパス
+            self.is_thinking = False
+            self.update_status('human')
+            self.board_view.update()
+
+    def after_bot_move(self):
+        self.check_win()
+        self.commit_move()
+        if not self.game_over:
+            self.bot_timer.start(self.bot_delay)
+
+    # --- 履歴（元に戻す / やり直し / what-if 分岐） ---
+    def commit_move(self):
+        """今の手で変化したマスを1手として履歴に積む"""
+        if self.move_changes:
+            self.history.record(self.move_changes, self.game_result)
+        self.move_changes = []
+        self.update_history_ui()
+
+    def update_history_ui(self):
+        t = TEXTS[self.current_lang]
+        h = self.history
+        busy = self.reveal_job is not None
+        self.btn_undo.setEnabled(bool(h.undo_stack) and not busy)
+        self.btn_redo.setEnabled(bool(h.redo_stack) and not busy)
+        self.btn_unfork.setEnabled(h.moves_since_fork() > 0 and not busy)
+        self.btn_branch.setEnabled(h.branch_count() > 1 and not busy)
+        key = 'lbl_history_fork' if h.forks else 'lbl_history'
+        self.lbl_history.setText(t[key].format(moves=len(h.undo_stack), forks=len(h.forks),
+                                               branches=h.branch_count(), since=h.moves_since_fork()))
+
+    def stop_bot(self):
+        """ボットの手番を打ち切る（思考中の一手は世代を進めて捨てる）"""
+        self.bot_timer.stop()
+        self.solver_gen += 1
+        self.is_thinking = False
+
+    def resync_solver(self):
+        """盤面を巻き戻したので、ボットのミラーを今の盤面から作り直す"""
+        opened, flags = self.board.snapshot_changes()
+        self.solver_reset.emit(self.solver_gen, self.grid_w, self.grid_h)
+        self.solver_apply.emit(self.solver_gen, tuple(opened), tuple(flags))
+
+    def show_position(self, result):
+        """巻き戻し・やり直し後の盤面に合わせて勝敗表示とステータスを整える"""
+        self.game_over = False
+        self.game_result = None
+        self.board_view.hide_overlay()
+        self.resync_solver()
+        if result:
+            self.game_over_seq(result == 'win')
+        else:
+            self.update_status('human')
+        self.update_history_ui()
+        self.board_view.update()
+
+    def undo_move(self):
+        """1手戻す（人間の手もボットの手も1手ずつ）。ボットは止まり、人間の番になる"""
+        if not self.history.undo_stack or self.reveal_job: return
+        self.stop_bot()
+        changes, _ = self.history.undo()
+        self.board.revert(changes)
+        # 1つ前の手が決着の手だったことはない（決着後は手を打てない）ので、常に続きから
+        self.show_position(None)
+
+    def redo_move(self):
+        if not self.history.redo_stack or self.reveal_job: return
+        self.stop_bot()
+        changes, result = self.history.redo()
+        self.board.replay(changes)
+        self.show_position(result)
+
+    def fork_branch(self):
+        """
+        今の局面を分岐点にする（推測が必要な場面で使う）。
+        分岐後に試した手とボットの続きは「分岐点へ戻る」でまとめて巻き戻せて、
+        戻った後に別のマスを試すと別の枝になる。「枝を切替」で各枝の結末を見比べられる。
+        """
+        if self.reveal_job: return
+        self.history.fork()
+        self.update_history_ui()
+
+    def rewind_to_fork(self):
+        h = self.history
+        depth = h.forks[-1][0]
+        while len(h.undo_stack) > depth:
+            changes, _ = h.undo()
+            self.board.revert(changes)
+
+    def back_to_fork(self):
+        if self.history.moves_since_fork() <= 0 or self.reveal_job: return
+        self.stop_bot()
+        self.rewind_to_fork()
+        self.show_position(None)
+
+    def switch_branch(self):
+        """分岐点まで戻して次の枝に入れ替え、その枝の最後の局面まで進める"""
+        h = self.history
+        if h.branch_count() < 2 or self.reveal_job: return
+        self.stop_bot()
+        self.rewind_to_fork()
+        h.switch_branch()
+        result = None
+        while h.redo_stack:
+            changes, result = h.redo()
+            self.board.replay(changes)
+        self.show_position(result)
+
+    def closeEvent(self, event):
+        """終了時にワーカースレッドとトーナメントのプロセスを止める"""
+        if self.tour is not None: self.tour.stop()
+        self.solver_thread.quit()
+        self.solver_thread.wait()
+        super().closeEvent(event)
+
+    def game_over_seq(self, win):
+        """ゲーム終了処理（勝敗判定と演出）"""
+        if self.game_over: return
+        self.game_over = True
+        self.game_result = 'win' if win else 'lose'
+        self.board_view.update()
+        if win:
+            self.sound_manager.play('win')
+            self.update_status('win')
+            self.board_view.show_overlay("MISSION PASSED", "#f1c40f") # 金色
+        else:
+            self.sound_manager.play('lose')
+            self.update_status('lose')
+            # 負けた時はすべての爆弾を表示（この手の変化として履歴にも残す）
+            for i, c in enumerate(self.board.flat):
+                if c['is_mine'] and not c['revealed']:
+                    c['revealed'] = True
+                    self.move_changes.append((i, MINE))
+            self.board_view.update()
+            self.board_view.show_overlay("WASTED", "#e74c3c") # 赤色
+
+def print_startup_profile(t_start, t_app, t_window):
+    """起動計測モード: 各段階までの経過時間を表示する（最初の盤面描画時に呼ばれる）"""
+    t_paint = time.perf_counter()
+    rows = [('import', _T_IMPORTED), ('QApplication', t_app), ('window', t_window), ('first paint', t_paint)]
+    prev = t_start
+    for name, t in rows:
+        print(f"{name:<14}{(t - prev) * 1000:8.1f} ms  (total {(t - t_start) * 1000:8.1f} ms)", file=sys.stderr)
+        prev = t
+
+def _measure_alloc(fn):
+    """
+    fn() 1回分のメモリを tracemalloc と GC 追跡オブジェクト数で測る。
+    戻り値: (fn の戻り値, 残ったバイト数, 一時的なピークのバイト数, 残ったオブジェクト数)
+    tracemalloc は解放済みの確保を数えないので、手ごとの使い捨て（churn）はピークで見る。
+    """
+    import gc, tracemalloc
+    gc.collect()
+    objs0 = len(gc.get_objects())
+    tracemalloc.reset_peak()
+    cur0 = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    cur, peak = tracemalloc.get_traced_memory()
+    return result, cur - cur0, peak - cur0, len(gc.get_objects()) - objs0
+
+def run_memory_profile(window, sizes=(16, 32, 64, 128), steps=200, paints=20, out=sys.stdout):
+    """
+    メモリ計測モード: 盤面サイズごとに以下を表にする（メモリ予算の決定と、ホットループの退行検出用）。
+      B/cell      restart_game 後に残った盤面 (DictBoard) の1マスあたりバイト数
+      reset peak  restart_game 中のピーク
+      bot B/cell  LogicBot（ボット側のミラー）の1マスあたりバイト数
+      step peak / step objs   next_action 1回あたりの一時ピークと、残ったオブジェクト数
+      paint peak / paint objs paintEvent 1回あたりの一時ピークと、残ったオブジェクト数（QRect/QFont が溜まれば増える）
+    ボットは GUI スレッドの外で動くので、ワーカーを止めて同じ手順をこのスレッドで直接実行して測る。
+    """
+    import tracemalloc
+    window.solver_thread.quit()
+    window.solver_thread.wait()
+    view = window.board_view
+    view.resize(640, 640)
+    tracemalloc.start()
+    print(f"{'size':>8} {'B/cell':>8} {'reset peak':>11} {'bot B/cell':>11} {'step peak':>10} {'step objs':>10} {'paint peak':>11} {'paint objs':>11}", file=out)
+    for size in sizes:
+        window.tf_w.setText(str(size))
+        window.tf_h.setText(str(size))
+        cells = size * size
+        _, kept, reset_peak, _ = _measure_alloc(window.restart_game)
+        board = window.board
+
+        bot, bot_kept, _, _ = _measure_alloc(lambda: LogicBot(size, size))
+        start = next(i for i, c in enumerate(board.flat) if not c['is_mine'] and c['neighbor'] == 0)
+        bot.reveal(board.reveal(start))
+        step_peak = step_objs = n = 0
+        while n < steps:
+            action, _, peak, objs = _measure_alloc(lambda: bot.next_action(window.bot_strategy))
+            if not action: break
+            step_peak += peak; step_objs += objs; n += 1
+            kind, i = action
+            if kind == 'flag':
+                board.flag(i); bot.flag(i)
+            else:
+                bot.reveal(board.reveal(i))
+
+        def paint():
+            view.grab() # 返ってくる QPixmap は残さない（描画中の確保だけを測る）
+        paint() # フォント等の初回キャッシュを計測から外す
+        paint_peak = paint_objs = 0
+        for _ in range(paints):
+            _, _, peak, objs = _measure_alloc(paint)
+            paint_peak += peak; paint_objs += objs
+        n = max(n, 1)
+        print(f"{size:>4}x{size:<3} {kept / cells:8.1f} {reset_peak / 1024:8.1f} KB {bot_kept / cells:11.1f}"
+              f" {step_peak / n:8.0f} B {step_objs / n:10.2f} {paint_peak / paints / 1024:8.1f} KB {paint_objs / paints:11.2f}", file=out)
+    tracemalloc.stop()
+
+def main(argv, t_start):
+    """GUI を起動する。t_start は起動計測 (--startup-profile) の基準時刻"""
+    # --pattern-cache PATH: パターン推論キャッシュを起動時に読み込み、終了時に保存する
+    cache_path = None
+    if '--pattern-cache' in argv[:-1]:
+        cache_path = argv[argv.index('--pattern-cache') + 1]
+        PATTERN_CACHE.load(cache_path)
+    app = QApplication(argv)
+    t_app = time.perf_counter()
+    w = LuckSweeperWindow()
+    if '--memprofile' in argv:
+        # 盤面サイズごとのメモリ使用量を表にして終了する
+        run_memory_profile(w)
+        return 0
+    if '--startup-profile' in argv:
+        # 最初の盤面が描画された時点で計測結果を表示して終了する
+        t_window = time.perf_counter()
+        def report():
+            print_startup_profile(t_start, t_app, t_window)
+            QTimer.singleShot(0, app.quit)
+        w.board_view.on_first_paint = report
+    w.show()
+    code = app.exec()
+    if cache_path:
+        PATTERN_CACHE.save(cache_path)
+        print(PATTERN_CACHE.stats(), file=sys.stderr)
+    return code
@@ -0,0 +1,283 @@
+# 観戦・対戦サーバー (python mine.py --serve / --loadtest)
+# asyncio は読み込みが重いので、GUI やトーナメントのワーカーからは読み込まない
+import sys
+import time
+import random
+import struct
+import asyncio
+import traceback
+
+from engine import FLAGGED, MINE, LogicBot, DictBoard, place_mines, pack_deltas, parse_board_size
+
+# ==========================================
+# 観戦・対戦サーバー (--serve / --loadtest)
+# ==========================================
+# バイナリプロトコル（すべてリトルエンディアン）
+#   クライアント -> サーバー:  'R' / 'F' + uint32 インデックス（開ける / 旗を立てる）
+#   サーバー -> クライアント:
+#     'N' + uint16 幅, uint16 高さ, uint32 爆弾数      新しいゲーム（接続時にも送る）
+#     'D' + uint64 発行時刻ns, uint32 件数 + 差分       変化したマス（pack_deltas の形式）
+#     'A' + uint32 処理済みの操作数                    自分の操作の受付（最新の値だけ送る）
+#     'O' + uint8 勝ったか                              ゲーム終了
+ACTION = struct.Struct('<cI')
+FRAME_BODY = {b'N': struct.Struct('<HHI'), b'D': struct.Struct('<QI'), b'A': struct.Struct('<I'), b'O': struct.Struct('<B')}
+
+class Subscriber:
+    """
+    1クライアント分の送信キュー。
+    まだ送れていない変化はマスごとに最新のコードだけを残して合体し、新しいゲームでは前のゲームの未送信分を捨てるので、
+    遅いクライアントでも溜まるのは1局分まで。書き込みは drain() を待つ（バックプレッシャ）ので、その間の変化は次の1フレームにまとまる。
+    """
+    def __init__(self, writer):
+        self.writer = writer
+        self.frames = []     # 順序を守るフレーム（新しいゲーム・終了）
+        self.pending = {}    # インデックス -> コード（合体済みの差分）
+        self.pending_since = 0
+        self.acked = None    # 送っていない最新の受付数
+        self.wake = asyncio.Event()
+
+    def push(self, changes):
+        if not changes: return
+        if not self.pending: self.pending_since = time.monotonic_ns()
+        for i, code in changes:
+            self.pending[i] = code
+        self.wake.set()
+
+    def send(self, kind, *values):
+        # 順序つきフレームの前に、それまでの差分を確定させる
+        self.flush_pending()
+        self.frames.append(kind + FRAME_BODY[kind].pack(*values))
+        self.wake.set()
+
+    def reset(self, kind, *values):
+        """新しいゲーム: 前のゲームの送っていないフレームと差分は捨て、新しいゲームの見出しだけを残す"""
+        self.pending.clear()
+        self.frames.clear()
+        self.send(kind, *values)
+
+    def ack(self, count):
+        self.acked = count
+        self.wake.set()
+
+    def flush_pending(self):
+        if self.pending:
+            body = pack_deltas(self.pending.items())
+            self.frames.append(b'D' + FRAME_BODY[b'D'].pack(self.pending_since, len(self.pending)) + body)
+            self.pending.clear()
+
+    async def pump(self):
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            self.flush_pending()
+            if self.acked is not None:
+                self.frames.append(b'A' + FRAME_BODY[b'A'].pack(self.acked))
+                self.acked = None
+            data = b''.join(self.frames)
+            self.frames.clear()
+            self.writer.write(data)
+            await self.writer.drain()
+
+class GameServer:
+    """
+    エンジン (DictBoard) の1局をホストする asyncio サーバー。
+    クライアントは開ける・旗の操作を送れて、全員に変化したマスだけが差分で配信される。
+    bot_rate を指定するとサーバー側のボットが1秒あたりその回数だけ手を打つ（0以下なら全速）。
+    """
+    def __init__(self, w, h, ratio, sea=False, strategy='Island', restart_delay=1.0):
+        self.w = w
+        self.h = h
+        self.ratio = ratio
+        self.sea = sea
+        self.strategy = strategy
+        self.restart_delay = restart_delay
+        self.clients = set()
+        self.new_game()
+
+    def new_game(self):
+        self.board = DictBoard(self.w, self.h, place_mines(self.w, self.h, self.ratio, self.sea))
+        self.bot = LogicBot(self.w, self.h)
+        self.over = False
+        for client in self.clients:
+            client.reset(b'N', self.w, self.h, self.board.num_mines)
+
+    def apply(self, op, i):
+        """1つの操作を盤面に反映して配信する。無効な操作は何もしない"""
+        board = self.board
+        if self.over or not 0 <= i < self.w * self.h: return
+        cell = board.flat[i]
+        if op == b'F':
+            if not board.flag(i): return
+            self.bot.flag(i)
+            changes = [(i, FLAGGED)]
+            # 旗のない未開放マスが残っていない（安全マスに旗が立っている）ならもう勝てないので負け
+            self.over = board.flag_count == board.num_mines + board.hidden_safe
+        elif op == b'R':
+            if cell['revealed'] or cell['flagged']: return
+            if cell['is_mine']:
+                cell['revealed'] = True
+                changes = [(n, MINE) for n in board.mine_cells()]
+                self.over = True
+            else:
+                changes = board.reveal(i)
+                self.bot.reveal(changes)
+                self.over = board.is_won()
+        else:
+            return
+        for client in self.clients:
+            client.push(changes)
+        if self.over:
+            for client in self.clients:
+                client.send(b'O', board.is_won())
+            asyncio.get_running_loop().call_later(self.restart_delay, self.new_game)
+
+    async def handle(self, reader, writer):
+        client = Subscriber(writer)
+        self.clients.add(client)
+        client.send(b'N', self.w, self.h, self.board.num_mines)
+        # 途中から入ったクライアントには、今の盤面を1回分の差分として送る
+        client.push([(i, MINE if c['is_mine'] else c['neighbor']) if c['revealed'] else (i, FLAGGED)
+                     for i, c in enumerate(self.board.flat) if c['revealed'] or c['flagged']])
+        pump = asyncio.create_task(client.pump())
+        count = 0
+        try:
+            while True:
+                op, i = ACTION.unpack(await reader.readexactly(ACTION.size))
+                self.apply(op, i)
+                count += 1
+                client.ack(count)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            pump.cancel()
+            writer.close()
+
+    async def bot_loop(self, rate):
+        """サーバー側のボット。手詰まりなら未開放マスからランダムに推測する"""
+        while True:
+            await asyncio.sleep(1 / rate if rate > 0 else 0)
+            if self.over: continue
+            action = self.bot.next_action(self.strategy)
+            if action is None:
+                hidden = self.board.hidden_cells()
+                if not hidden: continue
+                action = ('reveal', random.choice(hidden))
+            kind, i = action
+            self.apply(b'F' if kind == 'flag' else b'R', i)
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+async def read_frame(reader):
+    """サーバーからのフレームを1つ読む: (種類, 値のタプル, 差分のバイト列)"""
+    kind = await reader.readexactly(1)
+    body = FRAME_BODY[kind]
+    values = body.unpack(await reader.readexactly(body.size))
+    deltas = await reader.readexactly(values[1] * 4) if kind == b'D' else b''
+    return kind, values, deltas
+
+def report_crash(task):
+    """誰も await しないタスクが例外で止まったら、黙って消えないように表示する"""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"{task.get_coro().__qualname__} stopped:", file=sys.stderr)
+        traceback.print_exception(task.exception())
+
+async def serve(args):
+    w, h = args.size
+    game = GameServer(w, h, args.ratio, args.sea, args.strategy, args.restart_delay)
+    if args.unix:
+        server = await asyncio.start_unix_server(game.handle, args.unix)
+    else:
+        server = await asyncio.start_server(game.handle, args.host, args.port)
+    if args.bot_rate is not None:
+        bot = asyncio.create_task(game.bot_loop(args.bot_rate))
+        bot.add_done_callback(report_crash)
+    print(f"serving {w}x{h} on {args.unix or f'{args.host}:{args.port}'}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+async def load_test(args):
+    """
+    観戦クライアントを args.clients 本つなぎ、1本の操作クライアントから args.actions 回の操作を送る。
+    操作のスループット（受付までを含む）と、差分が発行されてから各観戦者に届くまでの遅延を測る。
+    操作は未開放マスへの旗立て・開放をランダムに混ぜる（無効な操作もサーバーの処理としては数える）。
+    """
+    latencies = []
+    received = [0, 0] # フレーム数, バイト数
+    
+    async def spectate(reader):
+        try:
+            while True:
+                kind, values, deltas = await read_frame(reader)
+                received[0] += 1
+                received[1] += 1 + FRAME_BODY[kind].size + len(deltas)
+                if kind == b'D':
+                    latencies.append(time.monotonic_ns() - values[0])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+    
+    spectators = [await open_connection(args) for _ in range(args.clients)]
+    tasks = [asyncio.create_task(spectate(r)) for r, _ in spectators]
+    reader, writer = await open_connection(args)
+    kind, (w, h, _), _ = await read_frame(reader)
+    
+    acked = 0
+    done = asyncio.Event()
+    async def read_acks():
+        nonlocal acked
+        while acked < args.actions:
+            kind, values, _ = await read_frame(reader)
+            if kind == b'A':
+                acked = values[0]
+        done.set()
+    ack_task = asyncio.create_task(read_acks())
+    
+    t0 = time.perf_counter()
+    for sent in range(1, args.actions + 1):
+        writer.write(ACTION.pack(random.choice((b'R', b'F', b'F')), random.randrange(w * h)))
+        # 受付待ちが window 件を超えないように（サーバーを溢れさせない）
+        while sent - acked >= args.window:
+            await writer.drain()
+            await asyncio.sleep(0)
+    await done.wait()
+    elapsed = time.perf_counter() - t0
+    await asyncio.sleep(0.2) # 最後の差分が観戦者に届くのを待つ
+    
+    for t in tasks + [ack_task]:
+        t.cancel()
+    for _, wr in spectators + [(reader, writer)]:
+        wr.close()
+    
+    lat = sorted(latencies)
+    pick = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] / 1e6 if lat else float('nan')
+    print(f"actions: {args.actions} in {elapsed:.2f}s = {args.actions / elapsed:.0f} actions/s")
+    print(f"spectators: {args.clients}, frames {received[0]}, bytes {received[1]}")
+    print(f"fan-out latency ms: p50 {pick(0.5):.2f}  p95 {pick(0.95):.2f}  max {pick(1.0):.2f}")
+
+def run_server_cli(argv):
+    """python mine.py --serve [...] / python mine.py --loadtest [...]"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='mine.py --serve | --loadtest')
+    parser.add_argument('--serve', action='store_true', help='サーバーを起動する')
+    parser.add_argument('--loadtest', action='store_true', help='負荷試験クライアントを走らせる')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='TCPの代わりにUnixソケットを使う')
+    parser.add_argument('--size', default='64x64')
+    parser.add_argument('--ratio', type=float, default=0.15)
+    parser.add_argument('--sea', action='store_true')
+    parser.add_argument('--strategy', default='Island', choices=['Island', 'Standard'])
+    parser.add_argument('--bot-rate', type=float, help='サーバー側ボットの1秒あたりの手数（0で全速）')
+    parser.add_argument('--restart-delay', type=float, default=1.0)
+    parser.add_argument('--clients', type=int, default=50, help='負荷試験の観戦クライアント数')
+    parser.add_argument('--actions', type=int, default=5000, help='負荷試験の操作回数')
+    parser.add_argument('--window', type=int, default=64, help='受付待ちにできる操作の上限')
+    args = parser.parse_args(argv)
+    args.size = parse_board_size(parser, args.size)
+    try:
+        asyncio.run(load_test(args) if args.loadtest else serve(args))
+    except KeyboardInterrupt:
+        pass